@@ -0,0 +1 @@
+"""Processing."""
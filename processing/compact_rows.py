@@ -0,0 +1,215 @@
+"""Compact row encoding.
+
+In the compact encoding a report declares the item columns once, in the columns header field,
+and every item is a JSON array of values in column order instead of an object repeating the keys:
+
+    {"reporter_id": ..., "columns": ["id", "transaction_value", ...], "items": [["1", "10.00", ...]]}
+
+The columns have to precede the items. A null value is a field reported as null,
+and a row shorter than the columns leaves out the fields of the missing columns.
+Items that leave out a field before the last one they report stay objects,
+except for the first item, which has to be a row.
+Values beyond the columns are passed on as column_<position>,
+so they fail validation like unknown keys in the object encoding.
+When the first item is an object, columns is an ordinary header field.
+The report validator, probe and dispatcher workers read both encodings.
+"""
+
+import json
+from collections.abc import Iterable, Iterator
+from decimal import Decimal
+from itertools import chain
+from pathlib import Path
+from typing import IO, Any
+
+from pydantic import BaseModel
+
+from ..utils.family_schemas import FAMILY_SCHEMA_PATHS, family_schemas
+from .report_stream import ReportStream
+
+COLUMNS_KEY = "columns"
+
+
+def header_fields(header: dict[str, Any], rows: bool = True) -> dict[str, Any]:
+    """Report header fields without the columns of the compact encoding.
+
+    With rows False, the items are objects and columns is kept as a header field.
+    """
+    if not rows or COLUMNS_KEY not in header:
+        return header
+    return {key: value for key, value in header.items() if key != COLUMNS_KEY}
+
+
+def row_encoded(stream: ReportStream) -> bool:
+    """False when the first item of a report is an object, looked at before reading the items."""
+    return stream.peek_item() != "{"
+
+
+def item_columns(schema: type[BaseModel]) -> list[str]:
+    """Columns of the items of schema, in field order."""
+    return list(schema.model_fields)
+
+
+def header_columns(header: dict[str, Any]) -> list[str]:
+    """Columns of the item schema of a report, from the reported type in its header."""
+    for family in FAMILY_SCHEMA_PATHS:
+        schemas = family_schemas(family)
+        schema = schemas.items.get(header.get(schemas.reported_type_field))  # type: ignore[arg-type]
+        if schema is not None:
+            return item_columns(schema)
+    raise ValueError("Item schema can not be determined from header.")
+
+
+def report_columns(header: dict[str, Any], item: Any) -> list[str]:
+    """Columns of a report, the fields item reports followed by the other fields, in field order.
+
+    Items reporting the same fields as item are written as rows.
+    """
+    columns = header_columns(header)
+    if not isinstance(item, dict):
+        return columns
+    return [column for column in columns if column in item] + [
+        column for column in columns if column not in item
+    ]
+
+
+def check_columns(columns: Any) -> list[str]:
+    """Columns of a compact report, raises ValueError when malformed."""
+    if not isinstance(columns, list) or not all(
+        isinstance(column, str) for column in columns
+    ):
+        raise ValueError(
+            f"Malformed report. Expected columns to be a list of field names, got {columns!r}."
+        )
+    if len(set(columns)) != len(columns):
+        raise ValueError(f"Malformed report. Duplicate columns in {columns}.")
+    return columns
+
+
+def row_item(columns: list[str], row: Any) -> Any:
+    """Item of a row, rows that are not arrays are returned as they are."""
+    if not isinstance(row, list):
+        return row
+    item = dict(zip(columns, row, strict=False))
+    for position in range(len(columns), len(row)):
+        item[f"column_{position}"] = row[position]
+    return item
+
+
+def row_items(columns: list[str], rows: Iterable[Any]) -> Iterator[Any]:
+    """Items of rows."""
+    for row in rows:
+        yield row_item(columns, row)
+
+
+def item_row(columns: list[str], item: dict[str, Any]) -> list[Any] | dict[str, Any]:
+    """Row of an item, up to its last column.
+
+    Items leaving out a column before their last one are returned as they are.
+    Raises TypeError for items that are not objects and ValueError for keys that are not columns.
+    """
+    if not isinstance(item, dict):
+        raise TypeError(f"Item is not an object. Got {item!r}.")
+    unknown = item.keys() - set(columns)
+    if unknown:
+        raise ValueError(
+            f"Item keys are not columns. Got {sorted(unknown)}, columns {columns}."
+        )
+    reported = columns[: len(item)]
+    if not all(column in item for column in reported):
+        return item
+    return [item[column] for column in reported]
+
+
+def report_items(stream: ReportStream) -> Iterator[Any]:
+    """Items of a report in either encoding, as objects."""
+    columns = stream.read_header().get(COLUMNS_KEY)
+    if columns is None or not row_encoded(stream):
+        return stream.items()
+    return row_items(check_columns(columns), stream.items())
+
+
+def _dumps(value: Any) -> str:
+    """JSON of value, with decimals written as they were read."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, list):
+        return "[" + ", ".join(_dumps(element) for element in value) + "]"
+    if isinstance(value, dict):
+        members = (f"{json.dumps(key)}: {_dumps(value[key])}" for key in value)
+        return "{" + ", ".join(members) + "}"
+    return json.dumps(value)
+
+
+def _write_members(target: IO[str], members: dict[str, Any], first: bool) -> bool:
+    """Write object members, returns False once a member has been written."""
+    for key, value in members.items():
+        separator = "" if first else ",\n"
+        target.write(f"{separator}{json.dumps(key)}: {_dumps(value)}")
+        first = False
+    return first
+
+
+def _convert(
+    source: str | Path | IO[Any],
+    target: str | Path | IO[str],
+    compact: bool,
+    columns: list[str] | None,
+) -> None:
+    if isinstance(target, str | Path):
+        with open(target, "w", encoding="utf-8") as fp:
+            _convert(source, fp, compact, columns)
+        return
+    # Numbers are kept as decimals, so that they are written exactly as they were read.
+    with ReportStream(source, parse_float=Decimal) as stream:
+        rows = row_encoded(stream)
+        header = dict(header_fields(stream.read_header(), rows))
+        items = report_items(stream)
+        target.write("{")
+        first = _write_members(target, header, True)
+        if compact:
+            if COLUMNS_KEY in header:
+                raise ValueError(
+                    f"Malformed report. Expected no {COLUMNS_KEY} header field in a report of objects."
+                )
+            item = next(items, None)
+            columns = columns or report_columns(header, item)
+            if item is not None:
+                if not isinstance(item_row(columns, item), list):
+                    raise ValueError(
+                        f"First item leaves out a column before its last one. Got {item!r}, columns {columns}."
+                    )
+                items = chain([item], items)
+            first = _write_members(target, {COLUMNS_KEY: columns}, first)
+        target.write(("" if first else ",\n") + '"items": [')
+        for index, item in enumerate(items):
+            value = item_row(columns, item) if compact else item  # type: ignore[arg-type]
+            target.write(("\n" if not index else ",\n") + _dumps(value))
+        target.write("\n]")
+        # Header fields after the items array.
+        trailing = {
+            key: value
+            for key, value in header_fields(stream.header, rows).items()
+            if key not in header
+        }
+        _write_members(target, trailing, False)
+        target.write("}\n")
+
+
+def to_compact(
+    source: str | Path | IO[Any],
+    target: str | Path | IO[str],
+    columns: list[str] | None = None,
+) -> None:
+    """Convert a report to the compact encoding.
+
+    The columns are the fields of the item schema when None, see report_columns.
+    Raises TypeError for items that are not objects, and ValueError for item keys that are not columns
+    and for a first item that can not be written as a row.
+    """
+    _convert(source, target, True, columns)
+
+
+def from_compact(source: str | Path | IO[Any], target: str | Path | IO[str]) -> None:
+    """Convert a report in the compact encoding to the object encoding."""
+    _convert(source, target, False, None)
@@ -0,0 +1,364 @@
+"""Compressed input.
+
+Opens gzip and zstd compressed report files as binary streams of their decompressed content,
+detected from the magic bytes at the start of the file, so that reports are decompressed
+in a single streaming pass while they are parsed instead of to disk first.
+Uncompressed files are opened as they are. Reading zstd requires the zstandard package.
+
+Files of several gzip members or zstd frames, as written by bgzip and pzstd or by concatenating
+separately compressed files, can be decompressed by a pool of threads, one part of the file per
+thread. pigz and zstd -T write a single member or frame by default, and files of a single member
+are decompressed as a stream by one thread.
+Parts start at candidate member headers found by their magic bytes. A thread decompresses whole
+members from the start of its part until it reaches the next part, so a candidate that is not
+a member header is read as compressed data by the thread before it, and its own thread fails
+and is ignored. Decompression releases the GIL, so threads decompress in parallel.
+Each thread hands over its output in chunks through a small buffer, and waits while the buffer
+is full, so the decompressed data held per part is bounded.
+
+Example:
+    with ReportStream(open_input(path, workers=4)) as stream:
+        for item in stream.items():
+            ...
+"""
+
+import gzip
+import io
+import os
+import threading
+import zlib
+from collections import deque
+from collections.abc import Callable, Generator, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Protocol
+
+GZIP_MAGIC = b"\x1f\x8b\x08"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+DEFAULT_PART_BYTES = 1 << 24
+_READ_SIZE = 1 << 20
+_CHUNK_READ_SIZE = 1 << 16
+_PART_CHUNKS = 16
+
+
+class _Decompressor(Protocol):
+    eof: bool
+    unused_data: bytes
+
+    def decompress(self, data: bytes) -> bytes: ...
+
+
+def _gzip_decompressor() -> _Decompressor:
+    return zlib.decompressobj(wbits=31)  # type: ignore[return-value]
+
+
+def _zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "zstandard is required to read zstd compressed reports."
+        ) from e
+    return zstandard
+
+
+def _zstd_decompressor() -> _Decompressor:
+    return _zstandard().ZstdDecompressor().decompressobj()
+
+
+_DECOMPRESSORS: dict[str, Callable[[], _Decompressor]] = {
+    "gzip": _gzip_decompressor,
+    "zstd": _zstd_decompressor,
+}
+
+
+def compression(magic: bytes) -> str | None:
+    """Compression of a file from its first bytes, None when uncompressed."""
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip"
+    if magic.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def _sniff(fp: IO[bytes]) -> bytes:
+    """First bytes of a binary file object, without consuming them."""
+    if hasattr(fp, "peek"):
+        return fp.peek(len(ZSTD_MAGIC))[: len(ZSTD_MAGIC)]
+    if fp.seekable():
+        position = fp.tell()
+        magic = fp.read(len(ZSTD_MAGIC))
+        fp.seek(position)
+        return magic
+    return b""
+
+
+def decompressed_stream(fp: IO[bytes], kind: str | None) -> IO[bytes]:
+    """Binary stream of the decompressed content of fp."""
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=fp, mode="rb")
+    if kind == "zstd":
+        return (
+            _zstandard().ZstdDecompressor().stream_reader(fp, read_across_frames=True)
+        )
+    return fp
+
+
+def open_input(
+    source: str | Path | IO[bytes],
+    workers: int = 1,
+    part_bytes: int = DEFAULT_PART_BYTES,
+) -> IO[bytes]:
+    """Open a report file or binary file object, decompressing it when compressed.
+
+    With more than one worker, compressed files (not file objects) of several members are
+    decompressed in parallel, in parts of about part_bytes of compressed data.
+    Raises ImportError for zstd without the zstandard package.
+    """
+    if isinstance(source, str | Path):
+        with open(source, "rb") as fp:
+            kind = compression(fp.read(len(ZSTD_MAGIC)))
+        if kind is not None and workers > 1:
+            starts = member_starts(source, kind, part_bytes)
+            if len(starts) > 1:
+                return io.BufferedReader(
+                    _PartsReader(
+                        parallel_decompress(source, kind, workers, part_bytes, starts)
+                    ),
+                    buffer_size=_READ_SIZE,
+                )
+        fp = open(source, "rb")  # noqa: SIM115
+        try:
+            return decompressed_stream(fp, kind)
+        except BaseException:
+            fp.close()
+            raise
+    return decompressed_stream(source, compression(_sniff(source)))
+
+
+def member_starts(path: str | Path, kind: str, part_bytes: int) -> list[int]:
+    """Offsets of candidate member headers about part_bytes apart, starting with 0."""
+    magic = GZIP_MAGIC if kind == "gzip" else ZSTD_MAGIC
+    starts = [0]
+    with open(path, "rb") as fp:
+        size = fp.seek(0, os.SEEK_END)
+        target = part_bytes
+        while target < size:
+            fp.seek(target)
+            block = fp.read(_READ_SIZE)
+            found = block.find(magic)
+            while found == -1 and len(block) >= len(magic):
+                # Overlap blocks, so that magic bytes split across blocks are found.
+                target += len(block) - len(magic) + 1
+                fp.seek(target)
+                block = fp.read(_READ_SIZE)
+                found = block.find(magic)
+            if found == -1:
+                break
+            starts.append(target + found)
+            target += found + part_bytes
+    return starts
+
+
+def decompress_part(
+    path: str | Path, kind: str, start: int, end: int
+) -> Generator[bytes, None, int | None]:
+    """Decompress whole members from start until a member ends at or after end.
+
+    Yields the decompressed data in chunks, and returns the offset where the last member ends,
+    None when there is no valid member at start.
+    """
+    new_decompressor = _DECOMPRESSORS[kind]
+    errors: tuple[type[Exception], ...] = (zlib.error,)
+    if kind == "zstd":
+        errors = (_zstandard().ZstdError,)
+    position = start
+    with open(path, "rb") as fp:
+        fp.seek(start)
+        decompressor = new_decompressor()
+        pending = b""
+        while True:
+            data = pending or fp.read(_CHUNK_READ_SIZE)
+            pending = b""
+            if not data:
+                # A member continuing past the end of the file.
+                return None
+            try:
+                chunk = decompressor.decompress(data)
+            except errors:
+                return None
+            if chunk:
+                yield chunk
+            if not decompressor.eof:
+                position += len(data)
+                continue
+            unused = decompressor.unused_data
+            position += len(data) - len(unused)
+            if position >= end or not unused and not fp.peek(1):  # type: ignore[attr-defined]
+                return position
+            pending = unused
+            decompressor = new_decompressor()
+
+
+class _Cancelled(Exception):
+    """The output of a part is no longer wanted."""
+
+
+class _PartBuffer:
+    """Chunks of a part, handed from its decompressing thread to the reading thread.
+
+    The thread waits while the buffer holds max_chunks chunks.
+    """
+
+    def __init__(self, max_chunks: int = _PART_CHUNKS) -> None:
+        self.end: int | None = None
+        self._max_chunks = max_chunks
+        self._chunks: deque[bytes] = deque()
+        self._done = False
+        self._cancelled = False
+        self._condition = threading.Condition()
+
+    def fill(self, part: Generator[bytes, None, int | None]) -> None:
+        """Put the chunks of part, and keep the offset where its last member ends."""
+        try:
+            while True:
+                self._put(next(part))
+        except StopIteration as stop:
+            self.end = stop.value
+        except _Cancelled:
+            part.close()
+        finally:
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+
+    def _put(self, chunk: bytes) -> None:
+        with self._condition:
+            while len(self._chunks) >= self._max_chunks and not self._cancelled:
+                self._condition.wait()
+            if self._cancelled:
+                raise _Cancelled
+            self._chunks.append(chunk)
+            self._condition.notify_all()
+
+    def cancel(self) -> None:
+        """Drop the chunks, and stop the thread at its next chunk."""
+        with self._condition:
+            self._cancelled = True
+            self._chunks.clear()
+            self._condition.notify_all()
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            with self._condition:
+                while not self._chunks and not self._done:
+                    self._condition.wait()
+                if not self._chunks:
+                    return
+                chunk = self._chunks.popleft()
+                self._condition.notify_all()
+            yield chunk
+
+
+def _part_output(
+    path: str | Path,
+    kind: str,
+    position: int,
+    start: int,
+    buffer: _PartBuffer,
+    future: Future[None],
+) -> Generator[bytes, None, int]:
+    """Output of the part at start, when the output so far ends at position.
+
+    Returns the offset where the output ends after the part.
+    """
+    if start > position:
+        # The previous part started at a candidate that is not a member header.
+        gap = yield from decompress_part(path, kind, position, start)
+        if gap is None:
+            raise ValueError(
+                f"Malformed {kind} input. Expected a member at offset {position} of {path}."
+            )
+        position = gap
+    if start < position:
+        # The candidate is inside a member decompressed by a previous part.
+        return position
+    yield from buffer
+    future.result()
+    if buffer.end is None:
+        raise ValueError(
+            f"Malformed {kind} input. Expected a member at offset {start} of {path}."
+        )
+    return buffer.end
+
+
+def parallel_decompress(
+    path: str | Path,
+    kind: str,
+    workers: int,
+    part_bytes: int = DEFAULT_PART_BYTES,
+    starts: list[int] | None = None,
+) -> Iterator[bytes]:
+    """Decompressed content of a file of several members, in order, decompressed in parallel.
+
+    starts are the offsets of candidate member headers, found by member_starts when None.
+    At most two parts per worker are in flight.
+    Raises ValueError when the file is not valid compressed data.
+    """
+    if starts is None:
+        starts = member_starts(path, kind, part_bytes)
+    ends = [*starts[1:], os.path.getsize(path)]
+    position = 0
+    pending: deque[tuple[int, _PartBuffer, Future[None]]] = deque()
+
+    def take() -> Iterator[bytes]:
+        nonlocal position
+        start, buffer, future = pending.popleft()
+        try:
+            position = yield from _part_output(
+                path, kind, position, start, buffer, future
+            )
+        finally:
+            buffer.cancel()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for start, end in zip(starts, ends, strict=True):
+                buffer = _PartBuffer()
+                part = decompress_part(path, kind, start, end)
+                pending.append((start, buffer, executor.submit(buffer.fill, part)))
+                if len(pending) >= 2 * workers:
+                    yield from take()
+            while pending:
+                yield from take()
+        finally:
+            for _, buffer, _ in pending:
+                buffer.cancel()
+
+
+class _PartsReader(io.RawIOBase):
+    """Raw binary stream of an iterator of byte strings."""
+
+    def __init__(self, parts: Iterator[bytes]) -> None:
+        self._parts = parts
+        self._data = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._data:
+            part = next(self._parts, None)
+            if part is None:
+                return 0
+            self._data = memoryview(part)
+        size = min(len(buffer), len(self._data))
+        buffer[:size] = self._data[:size]
+        self._data = self._data[size:]
+        return size
+
+    def close(self) -> None:
+        close = getattr(self._parts, "close", None)
+        if close is not None:
+            close()
+        super().close()
@@ -0,0 +1,152 @@
+"""Concentration ratio computation.
+
+Computes the concentration ratio items reported by payment system operators, Section 7 in the regulations,
+from participant-level transaction values.
+The concentration ratio is the market share of the five largest senders of payment transactions within the payment system,
+by value and by number of transactions.
+"""
+
+import heapq
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from ..enums.full_enums import ConcentrationRatioType, PaymentSystem
+from ..enums.payment_system_operators_enums import PaymentSystemMetricConcentration
+from ..schemas.payment_system_operators_schemas import ConcentrationRatio
+from ..utils.field_validaton_functions import validate_quarterly
+
+LARGEST_SENDERS = 5
+_TWO_PLACES = Decimal("0.01")
+
+
+@dataclass(slots=True)
+class ParticipantTotals:
+    """Exact running totals for one sending participant."""
+
+    value: Decimal = Decimal(0)
+    number_of: int = 0
+
+
+class ConcentrationRatioCalculator:
+    """Concentration ratio calculator.
+
+    Consumes participant-level transaction values for one payment system and quarter in a single pass.
+    Memory is proportional to the number of participants, not the number of transactions.
+    """
+
+    def __init__(
+        self,
+        payment_system: PaymentSystem | str,
+        period: date | str,
+        largest_senders: int = LARGEST_SENDERS,
+    ) -> None:
+        """Set up calculator for the payment system and the last day of the reported quarter."""
+        if largest_senders < 1:
+            raise ValueError(
+                f"largest_senders has to be a positive number, got {largest_senders}."
+            )
+        self.payment_system = PaymentSystem(payment_system)
+        self.period = validate_quarterly(str(period))
+        self.largest_senders = largest_senders
+        self.participants: dict[str, ParticipantTotals] = {}
+        self.total_value = Decimal(0)
+        self.total_number_of = 0
+
+    def add(
+        self,
+        participant_id: str,
+        value: Decimal | int | str,
+        number_of: int = 1,
+        transaction_day: date | None = None,
+    ) -> None:
+        """Add the value and number of transactions sent by a participant.
+
+        Raises ValueError for values that are not finite numbers and for negative values.
+        """
+        try:
+            value = Decimal(value)
+        except InvalidOperation as e:
+            raise ValueError(
+                f"Transaction value is not a number. Got {value!r}."
+            ) from e
+        if not value.is_finite():
+            raise ValueError(
+                f"Transaction value has to be a finite number. Got {value}."
+            )
+        if value < 0 or number_of < 0:
+            raise ValueError(
+                f"Transaction value and number of transactions can not be negative. Got {value}, {number_of}."
+            )
+        if transaction_day is not None and not self._in_period(transaction_day):
+            raise ValueError(
+                f"Transaction day {transaction_day} is not in the quarter ending {self.period}."
+            )
+
+        totals = self.participants.get(participant_id)
+        if totals is None:
+            totals = self.participants[participant_id] = ParticipantTotals()
+        totals.value += value
+        totals.number_of += number_of
+        self.total_value += value
+        self.total_number_of += number_of
+
+    def update(self, records: Iterable[tuple[str, Decimal | int | str]]) -> None:
+        """Add (participant_id, value) records, each record counted as one transaction."""
+        for participant_id, value in records:
+            self.add(participant_id, value)
+
+    def ratio(self, concentration_ratio_type: ConcentrationRatioType) -> Decimal:
+        """Share of the largest senders, rounded to two decimals."""
+        if concentration_ratio_type == ConcentrationRatioType.ConcentrationByValue:
+            total = self.total_value
+            largest = heapq.nlargest(
+                self.largest_senders, (t.value for t in self.participants.values())
+            )
+        else:
+            total = Decimal(self.total_number_of)
+            largest = heapq.nlargest(
+                self.largest_senders,
+                (t.number_of for t in self.participants.values()),
+            )
+
+        if not total:
+            raise ValueError(
+                f"No transactions reported for {self.payment_system} in the quarter ending {self.period}."
+            )
+
+        return (sum(largest, Decimal(0)) / total).quantize(
+            _TWO_PLACES, rounding=ROUND_HALF_UP
+        )
+
+    def items(self, id_prefix: str | None = None) -> list[ConcentrationRatio]:
+        """Validated concentration ratio items, one per concentration ratio type."""
+        prefix = id_prefix or f"{self.payment_system}-{self.period.isoformat()}"
+        return [
+            ConcentrationRatio.model_validate(
+                {
+                    "id": f"{prefix}-{ratio_type.value}",
+                    "payment_system": self.payment_system,
+                    "payment_system_metric": PaymentSystemMetricConcentration.C,
+                    "concentration_ratio_type": ratio_type,
+                    "concentration_ratio_value": self.ratio(ratio_type),
+                }
+            )
+            for ratio_type in ConcentrationRatioType
+        ]
+
+    def _in_period(self, transaction_day: date) -> bool:
+        first_month = self.period.month - 2
+        return date(self.period.year, first_month, 1) <= transaction_day <= self.period
+
+
+def concentration_ratio_items(
+    payment_system: PaymentSystem | str,
+    period: date | str,
+    records: Iterable[tuple[str, Decimal | int | str]],
+) -> list[ConcentrationRatio]:
+    """Compute validated concentration ratio items from (participant_id, value) records."""
+    calculator = ConcentrationRatioCalculator(payment_system, period)
+    calculator.update(records)
+    return calculator.items()
@@ -0,0 +1,321 @@
+"""Control totals of report parts.
+
+A logical report, identified by reporter_id, actor_id, period and reported type,
+can be split into several report_part files. Control totals are computed per part
+in one streaming pass: the number of items and exact sums of number_of, transaction_value
+and value_of_transactions per payment_type, a rolling digest of the item contents
+and a bottom-k sketch of item hashes.
+
+The totals of the parts are small and are merged per logical report without reading the parts again.
+Parts that were expected and not received are flagged as missing, parts received more than once as duplicate,
+and different parts sharing items as overlapping. Two parts share items when their sketches share a hash,
+so overlap is never flagged falsely, and the larger the share of common items, the more certainly it is found.
+
+Example:
+    totals = [part_totals(path) for path in paths]
+    for key, report in merge_part_totals(totals, expected_parts).items():
+        print(key, report.counts, report.sums, report.issues)
+"""
+
+import hashlib
+import heapq
+import json
+from collections.abc import Collection, Iterable, Mapping
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import IO, Any, Self
+
+from .compact_rows import report_items
+from .report_stream import ReportStream
+from .report_validator import REPORTED_TYPE_FIELDS, report_family
+
+DEFAULT_SKETCH_SIZE = 1024
+SUM_FIELDS = ("number_of", "transaction_value", "value_of_transactions")
+
+# reporter_id, actor_id, period and reported type of a logical report.
+type ReportKey = tuple[str, str | None, str, str]
+
+
+def report_key(header: dict[str, Any]) -> ReportKey:
+    """Logical report of a report header, the period is date_from/date_to or period."""
+    family = report_family(header)
+    if "period" in header:
+        period = str(header["period"])
+    else:
+        period = f"{header.get('date_from')}/{header.get('date_to')}"
+    return (
+        header.get("reporter_id"),  # type: ignore[return-value]
+        header.get("actor_id"),
+        period,
+        header.get(REPORTED_TYPE_FIELDS[family]),
+    )
+
+
+def item_hash(item: Any) -> bytes:
+    """Hash of the canonical JSON of an item, unreported (null) fields are left out."""
+    if isinstance(item, dict) and None in item.values():
+        item = {key: value for key, value in item.items() if value is not None}
+    canonical = json.dumps(
+        item, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).digest()
+
+
+@dataclass
+class PartTotals:
+    """Control totals of a report part.
+
+    counts and sums are per payment_type, empty for items without one.
+    sketch holds the smallest item hashes, as integers in ascending order.
+    Values that are not numbers are counted in invalid_values and left out of the sums.
+    """
+
+    key: ReportKey
+    report_part: str | None = None
+    source: str = ""
+    items: int = 0
+    counts: dict[str, int] = field(default_factory=dict)
+    sums: dict[str, dict[str, Decimal]] = field(default_factory=dict)
+    invalid_values: int = 0
+    digest: str = ""
+    sketch: list[int] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON serializable totals, with sums as strings."""
+        return {
+            "key": list(self.key),
+            "report_part": self.report_part,
+            "source": self.source,
+            "items": self.items,
+            "counts": self.counts,
+            "sums": {
+                payment_type: {name: str(value) for name, value in sums.items()}
+                for payment_type, sums in self.sums.items()
+            },
+            "invalid_values": self.invalid_values,
+            "digest": self.digest,
+            "sketch": self.sketch,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """Totals of a dict returned by to_dict."""
+        return cls(
+            key=tuple(data["key"]),  # type: ignore[arg-type]
+            report_part=data["report_part"],
+            source=data["source"],
+            items=data["items"],
+            counts=data["counts"],
+            sums={
+                payment_type: {name: Decimal(value) for name, value in sums.items()}
+                for payment_type, sums in data["sums"].items()
+            },
+            invalid_values=data["invalid_values"],
+            digest=data["digest"],
+            sketch=data["sketch"],
+        )
+
+
+class PartTotalsBuilder:
+    """Control totals of a report part, computed item by item."""
+
+    def __init__(
+        self,
+        header: dict[str, Any],
+        source: str = "",
+        sketch_size: int = DEFAULT_SKETCH_SIZE,
+    ) -> None:
+        """Set up totals of the part with header."""
+        self.totals = PartTotals(report_key(header), header.get("report_part"), source)
+        self.sketch_size = sketch_size
+        self._digest = hashlib.blake2b(digest_size=16)
+        # Max heap, as negated hashes, of the smallest hashes and the set of them.
+        self._heap: list[int] = []
+        self._sketched: set[int] = set()
+
+    def add(self, item: Any) -> None:
+        """Add a raw item."""
+        totals = self.totals
+        totals.items += 1
+        hashed = item_hash(item)
+        self._digest.update(hashed)
+        self._sketch(int.from_bytes(hashed))
+        if not isinstance(item, dict):
+            return
+        payment_type = str(item.get("payment_type") or "")
+        totals.counts[payment_type] = totals.counts.get(payment_type, 0) + 1
+        sums = totals.sums.get(payment_type)
+        for name in SUM_FIELDS:
+            value = item.get(name)
+            if value is None:
+                continue
+            try:
+                number = Decimal(value if isinstance(value, str) else str(value))
+            except (InvalidOperation, TypeError, ValueError):
+                totals.invalid_values += 1
+                continue
+            if not number.is_finite():
+                totals.invalid_values += 1
+                continue
+            if sums is None:
+                sums = totals.sums[payment_type] = {}
+            sums[name] = sums.get(name, Decimal(0)) + number
+
+    def _sketch(self, value: int) -> None:
+        if value in self._sketched:
+            return
+        if len(self._heap) < self.sketch_size:
+            heapq.heappush(self._heap, -value)
+        elif value < -self._heap[0]:
+            self._sketched.discard(-heapq.heappushpop(self._heap, -value))
+        else:
+            return
+        self._sketched.add(value)
+
+    def result(self) -> PartTotals:
+        """Totals of the items added."""
+        self.totals.digest = self._digest.hexdigest()
+        self.totals.sketch = sorted(self._sketched)
+        return self.totals
+
+
+def part_totals(
+    source: str | Path | IO[Any], sketch_size: int = DEFAULT_SKETCH_SIZE
+) -> PartTotals:
+    """Control totals of a report part file, in either item encoding.
+
+    The header fields identifying the report have to precede the items array.
+    """
+    with ReportStream(source) as stream:
+        builder = PartTotalsBuilder(
+            stream.read_header(),
+            str(source) if isinstance(source, str | Path) else "",
+            sketch_size,
+        )
+        for item in report_items(stream):
+            builder.add(item)
+    return builder.result()
+
+
+@dataclass(frozen=True, slots=True)
+class PartIssue:
+    """Issue of the parts of a logical report.
+
+    kind is missing, unexpected, duplicate or overlap.
+    For overlap, shared_items estimates the number of items the two parts have in common.
+    """
+
+    kind: str
+    report_parts: tuple[str | None, ...]
+    detail: str = ""
+    shared_items: int = 0
+
+
+@dataclass
+class ReportTotals:
+    """Merged control totals of the parts of a logical report, duplicate parts counted once."""
+
+    key: ReportKey
+    parts: dict[str | None, PartTotals] = field(default_factory=dict)
+    items: int = 0
+    counts: dict[str, int] = field(default_factory=dict)
+    sums: dict[str, dict[str, Decimal]] = field(default_factory=dict)
+    issues: list[PartIssue] = field(default_factory=list)
+
+    @property
+    def is_complete(self) -> bool:
+        """True when the parts have no issues."""
+        return not self.issues
+
+    def add(self, part: PartTotals) -> None:
+        """Add the totals of a part, a part received before is flagged as duplicate."""
+        previous = self.parts.get(part.report_part)
+        if previous is not None:
+            same = previous.digest == part.digest
+            self.issues.append(
+                PartIssue(
+                    "duplicate",
+                    (part.report_part,),
+                    f"{'Same' if same else 'Different'} content in {previous.source} and {part.source}.",
+                )
+            )
+            return
+        self.parts[part.report_part] = part
+        self.items += part.items
+        for payment_type, count in part.counts.items():
+            self.counts[payment_type] = self.counts.get(payment_type, 0) + count
+        for payment_type, sums in part.sums.items():
+            merged = self.sums.setdefault(payment_type, {})
+            for name, value in sums.items():
+                merged[name] = merged.get(name, Decimal(0)) + value
+
+    def check_overlaps(self, sketch_size: int = DEFAULT_SKETCH_SIZE) -> None:
+        """Flag pairs of parts sharing items."""
+        parts = list(self.parts.values())
+        for i, first in enumerate(parts):
+            for second in parts[i + 1 :]:
+                shared = shared_items(first, second, sketch_size)
+                if shared:
+                    self.issues.append(
+                        PartIssue(
+                            "overlap",
+                            (first.report_part, second.report_part),
+                            f"About {shared} items in both {first.source} and {second.source}.",
+                            shared,
+                        )
+                    )
+
+    def check_expected(self, expected: Collection[str | None]) -> None:
+        """Flag expected parts that were not received, and received parts that were not expected."""
+        for report_part in expected:
+            if report_part not in self.parts:
+                self.issues.append(PartIssue("missing", (report_part,)))
+        for report_part in self.parts:
+            if report_part not in expected:
+                self.issues.append(PartIssue("unexpected", (report_part,)))
+
+
+def shared_items(
+    first: PartTotals, second: PartTotals, sketch_size: int = DEFAULT_SKETCH_SIZE
+) -> int:
+    """Estimated number of items in both parts, 0 when their sketches share no hash.
+
+    The Jaccard similarity is estimated from the smallest hashes of the union of the sketches.
+    """
+    if first.digest == second.digest and first.items:
+        return first.items
+    common = set(first.sketch) & set(second.sketch)
+    if not common:
+        return 0
+    union = heapq.nsmallest(sketch_size, set(first.sketch) | set(second.sketch))
+    similarity = sum(1 for value in union if value in common) / len(union)
+    estimate = round(similarity * (first.items + second.items) / (1 + similarity))
+    return max(estimate, len(common))
+
+
+def merge_part_totals(
+    parts: Iterable[PartTotals],
+    expected_parts: Mapping[ReportKey, Collection[str | None]] | None = None,
+    sketch_size: int = DEFAULT_SKETCH_SIZE,
+) -> dict[ReportKey, ReportTotals]:
+    """Merge the totals of parts per logical report and flag their issues.
+
+    With expected_parts, the report parts expected per logical report,
+    logical reports without any part received are included with all their parts missing.
+    """
+    reports: dict[ReportKey, ReportTotals] = {}
+    for part in parts:
+        report = reports.get(part.key)
+        if report is None:
+            report = reports[part.key] = ReportTotals(part.key)
+        report.add(part)
+    for report in reports.values():
+        report.check_overlaps(sketch_size)
+    if expected_parts is not None:
+        for key, expected in expected_parts.items():
+            report = reports.get(key)
+            if report is None:
+                report = reports[key] = ReportTotals(key)
+            report.check_expected(expected)
+    return reports
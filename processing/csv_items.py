@@ -0,0 +1,250 @@
+"""Typed CSV items.
+
+Reads item level CSV extracts, with a header row naming the fields of an item schema,
+as items for validation, without converting the file to JSON first.
+
+Columns are converted batch by batch to the types of their schema fields:
+ints for integer fields and integer enums (for example initiation_channel and card_type),
+and floats for float fields. Fixed-point values, dates and timestamps are kept as the exact strings
+they are in JSON reports, and parsed by the schema. Cells that are not valid for their type are kept
+as strings, so they are rejected by validation. An empty cell means that the field is not reported.
+
+Items can be validated one by one or in batches, and large files can be split into chunks
+at row boundaries and parsed in parallel.
+
+Example:
+    context = ReportContext.from_report(report)
+    with CsvItems(path, CreditTransfer) as items:
+        ReportValidator().validate_items(items, CreditTransfer, context, result)
+    for start, batch in CsvItems(path, CreditTransfer).batches():
+        valid, errors = validate_batch(CreditTransfer, None, context, start, batch)
+"""
+
+import csv
+import io
+import os
+import re
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, pairwise
+from pathlib import Path
+from typing import IO, Any, Self
+
+from pydantic import BaseModel
+
+from ..utils.item_fields import BATCH_SIZE, field_value_type
+from .compressed_input import ZSTD_MAGIC, compression, open_input
+
+DEFAULT_CHUNK_BYTES = 1 << 24
+_SCAN_BLOCK = 1 << 20
+_INT = re.compile(r"-?[0-9]+")
+_FLOAT = re.compile(r"-?[0-9]+(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?")
+
+type ColumnConverter = Callable[[Sequence[str]], list[Any]]
+
+
+def _int_column(values: Sequence[str]) -> list[Any]:
+    return [int(v) if _INT.fullmatch(v) else (v or None) for v in values]
+
+
+def _float_column(values: Sequence[str]) -> list[Any]:
+    return [float(v) if _FLOAT.fullmatch(v) else (v or None) for v in values]
+
+
+def _text_column(values: Sequence[str]) -> list[Any]:
+    return [v or None for v in values]
+
+
+def column_converter(schema: type[BaseModel], column: str) -> ColumnConverter:
+    """Converter of the string values of a column to the type of its schema field."""
+    field = schema.model_fields.get(column)
+    value_type = str if field is None else field_value_type(field.annotation)
+    if value_type is int:
+        return _int_column
+    if value_type is float:
+        return _float_column
+    return _text_column
+
+
+def csv_columns(header: list[str]) -> list[str]:
+    """Columns of a CSV header row, raises ValueError when malformed."""
+    columns = [column.strip() for column in header]
+    if len(set(columns)) != len(columns):
+        raise ValueError(f"Malformed CSV. Duplicate columns in {columns}.")
+    return columns
+
+
+def convert_rows(
+    columns: list[str], converters: list[ColumnConverter], rows: list[list[str]]
+) -> list[dict[str, Any]]:
+    """Items of CSV rows, converting column by column.
+
+    Cells beyond the columns are passed on as column_<position>,
+    so they fail validation like unknown keys in JSON items.
+    """
+    width = len(columns)
+    cells = [row if len(row) == width else (row + [""] * width)[:width] for row in rows]
+    converted = [
+        convert(values)
+        for convert, values in zip(converters, zip(*cells, strict=True), strict=True)
+    ]
+    items = [
+        {column: v for column, v in zip(columns, values, strict=True) if v is not None}
+        for values in zip(*converted, strict=True)
+    ] or [{} for _ in rows]
+    for item, row in zip(items, rows, strict=True):
+        for position in range(width, len(row)):
+            item[f"column_{position}"] = row[position]
+    return items
+
+
+class CsvItems:
+    """Items of a CSV file, read in typed batches."""
+
+    def __init__(
+        self,
+        source: str | Path | IO[str],
+        schema: type[BaseModel],
+        batch_size: int = BATCH_SIZE,
+        delimiter: str = ",",
+    ) -> None:
+        """Open CSV from a path or a text file object and read its header row.
+
+        Gzip and zstd compressed files are decompressed while they are read.
+        Raises ValueError when there is no header row.
+        """
+        if isinstance(source, str | Path):
+            source = io.TextIOWrapper(
+                open_input(source), encoding="utf-8-sig", newline=""
+            )
+            self._owns_file = True
+        else:
+            self._owns_file = False
+        self._fp = source
+        # Empty lines are skipped.
+        self._rows = filter(None, csv.reader(source, delimiter=delimiter))
+        header = next(self._rows, None)
+        if header is None:
+            self.close()
+            raise ValueError("Malformed CSV. Missing header row.")
+        self.schema = schema
+        self.batch_size = batch_size
+        self.columns = csv_columns(header)
+        self.converters = [column_converter(schema, column) for column in self.columns]
+
+    def __enter__(self) -> Self:
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        """Close file if opened by the reader."""
+        self.close()
+
+    def close(self) -> None:
+        """Close file if opened by the reader."""
+        if self._owns_file:
+            self._fp.close()
+
+    def batches(self) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        """Batches of items with the index of their first item."""
+        start = 0
+        while rows := list(islice(self._rows, self.batch_size)):
+            yield start, convert_rows(self.columns, self.converters, rows)
+            start += len(rows)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the items one at a time."""
+        for _, batch in self.batches():
+            yield from batch
+
+
+def csv_chunks(
+    path: str | Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> list[tuple[int, int]]:
+    """Byte ranges of chunks of about chunk_bytes of the rows after the header row.
+
+    Chunks end at line breaks outside quoted cells,
+    found by the parity of the quotes before them (escaped quotes are doubled).
+    """
+    ends: list[int] = []
+    next_end = 0
+    odd_quotes = 0
+    offset = 0
+    with open(path, "rb") as fp:
+        while block := fp.read(_SCAN_BLOCK):
+            counted = 0
+            position = max(next_end - offset, 0)
+            while (newline := block.find(b"\n", position)) != -1:
+                odd_quotes ^= block.count(b'"', counted, newline) & 1
+                counted = newline
+                position = newline + 1
+                if not odd_quotes:
+                    ends.append(offset + newline + 1)
+                    next_end = offset + newline + 1 + chunk_bytes
+                    position = max(next_end - offset, position)
+            odd_quotes ^= block.count(b'"', counted) & 1
+            offset += len(block)
+    if not ends:
+        return []
+    if ends[-1] != offset:
+        ends.append(offset)
+    return list(pairwise(ends))
+
+
+def read_csv_chunk(
+    path: str | Path,
+    schema: type[BaseModel],
+    columns: list[str],
+    start: int,
+    end: int,
+    delimiter: str = ",",
+) -> list[dict[str, Any]]:
+    """Items of the rows in a chunk of a CSV file."""
+    with open(path, "rb") as fp:
+        fp.seek(start)
+        data = fp.read(end - start)
+    rows = list(
+        filter(
+            None,
+            csv.reader(
+                io.StringIO(data.decode("utf-8"), newline=""), delimiter=delimiter
+            ),
+        )
+    )
+    converters = [column_converter(schema, column) for column in columns]
+    return convert_rows(columns, converters, rows)
+
+
+def parallel_csv_items(
+    path: str | Path,
+    schema: type[BaseModel],
+    workers: int | None = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    delimiter: str = ",",
+) -> Iterator[dict[str, Any]]:
+    """Items of a CSV file, parsed in chunks by a process pool.
+
+    Items are yielded in file order, with at most two chunks per worker in flight.
+    Raises ValueError for compressed files, which can not be split into chunks.
+    """
+    with open(path, "rb") as fp:
+        if compression(fp.read(len(ZSTD_MAGIC))) is not None:
+            raise ValueError(
+                f"Compressed CSV can not be parsed in chunks. Got {path}, decompress it first."
+            )
+    with CsvItems(path, schema, delimiter=delimiter) as csv_items:
+        columns = csv_items.columns
+    workers = workers or os.cpu_count() or 1
+    pending: deque = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for start, end in csv_chunks(path, chunk_bytes):
+            pending.append(
+                executor.submit(
+                    read_csv_chunk, path, schema, columns, start, end, delimiter
+                )
+            )
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,107 @@
+"""Family worker.
+
+Validates report files in a worker process of the report dispatcher.
+A worker only validates reports of one family and only imports the schemas of that family,
+see family_schemas. The items are validated with check_item, without raising per invalid item.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+
+from pydantic import ValidationError
+from pydantic_core import ErrorDetails
+
+from ..utils.family_schemas import family_schemas
+from ..utils.validation_clock import ValidationClock
+from ..utils.validation_context import ReportContext
+from .compact_rows import header_fields, report_items, row_encoded
+from .item_errors import ItemError
+from .item_results import check_item
+from .report_stream import ReportStream
+
+DEFAULT_MAX_ERRORS = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class FamilyReportResult:
+    """Result of a report validated by a family worker.
+
+    item_errors holds the errors of the first max_errors invalid items, errors counts all of them.
+    started and finished are wall clock times in nanoseconds.
+    """
+
+    source: str
+    family: str
+    header_errors: list[ErrorDetails] = field(default_factory=list)
+    items: int = 0
+    valid_items: int = 0
+    errors: int = 0
+    item_errors: list[ItemError] = field(default_factory=list)
+    pid: int = 0
+    started: int = 0
+    finished: int = 0
+
+    @property
+    def is_valid(self) -> bool:
+        """True when header and all items are valid."""
+        return not self.header_errors and not self.errors
+
+
+def warm_worker(family: str) -> None:
+    """Pool initializer importing the schemas of a family."""
+    family_schemas(family)
+
+
+def worker_pid() -> int:
+    """Process id of the worker, used to start the workers of a pool."""
+    return os.getpid()
+
+
+def validate_family_report(
+    source: str, family: str, max_errors: int = DEFAULT_MAX_ERRORS
+) -> FamilyReportResult:
+    """Validate a report file of family."""
+    started = time.time_ns()
+    schemas = family_schemas(family)
+    clock = ValidationClock()
+    items = valid_items = errors = 0
+    item_errors: list[ItemError] = []
+    with ReportStream(source) as stream:
+        header = stream.read_header()
+        try:
+            report = schemas.report.model_validate(
+                {**header_fields(header, row_encoded(stream)), "items": []},
+                context=ReportContext(clock=clock),
+            )
+        except ValidationError as e:
+            return FamilyReportResult(
+                source,
+                family,
+                header_errors=e.errors(),
+                pid=os.getpid(),
+                started=started,
+                finished=time.time_ns(),
+            )
+        schema = schemas.item_schema(report)
+        context = ReportContext.from_report(report, clock)
+        for index, item in enumerate(report_items(stream)):
+            items += 1
+            result = check_item(schema, item, context)
+            if result.valid:
+                valid_items += 1
+                continue
+            errors += 1
+            if len(item_errors) < max_errors:
+                item_errors.append(ItemError(index, result.error_details()))
+    return FamilyReportResult(
+        source,
+        family,
+        items=items,
+        valid_items=valid_items,
+        errors=errors,
+        item_errors=item_errors,
+        pid=os.getpid(),
+        started=started,
+        finished=time.time_ns(),
+    )
@@ -0,0 +1,159 @@
+"""Item errors.
+
+Errors of the invalid items in a report, with an estimate of the memory they hold.
+Above a size limit the errors are spilled to a temporary JSON lines file,
+so reports with many invalid items do not keep all their errors in memory.
+"""
+
+import json
+import sys
+import tempfile
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import IO
+
+from pydantic_core import ErrorDetails
+
+from .memory_accounting import MemoryLimitError
+
+
+@dataclass(frozen=True, slots=True)
+class ItemError:
+    """Errors for the item at index in the items list."""
+
+    index: int
+    errors: list[ErrorDetails]
+
+
+def error_size(error: ItemError) -> int:
+    """Estimated bytes held by an item error."""
+    size = sys.getsizeof(error) + sys.getsizeof(error.errors)
+    for details in error.errors:
+        size += (
+            sys.getsizeof(details)
+            + sys.getsizeof(details["loc"])
+            + sys.getsizeof(details["msg"])
+            + sys.getsizeof(details.get("input"))
+        )
+    return size
+
+
+def encode_error(error: ItemError) -> str:
+    """JSON line of an item error, exception objects in the error context are written as strings."""
+    return json.dumps([error.index, error.errors], default=str) + "\n"
+
+
+def decode_error(line: str) -> ItemError:
+    """Item error of a JSON line written by encode_error."""
+    index, errors = json.loads(line)
+    for details in errors:
+        details["loc"] = tuple(details["loc"])
+    return ItemError(index, errors)
+
+
+class ErrorStore:
+    """Item errors of a validation run, in item order."""
+
+    def __init__(
+        self,
+        max_bytes: int | None = None,
+        spill: bool = True,
+        spill_dir: str | Path | None = None,
+    ) -> None:
+        """Set up store holding at most max_bytes of errors in memory.
+
+        Above max_bytes the errors are spilled to a temporary file in spill_dir,
+        or MemoryLimitError is raised when spill is False.
+        """
+        self.max_bytes = max_bytes
+        self.spill = spill
+        self.spill_dir = spill_dir
+        self._errors: list[ItemError] = []
+        self._memory_bytes = 0
+        self._spill_file: IO[str] | None = None
+        self.bytes = 0
+        self.spilled = 0
+
+    def append(self, error: ItemError) -> None:
+        """Add an item error."""
+        size = error_size(error)
+        self.bytes += size
+        self._memory_bytes += size
+        self._errors.append(error)
+        if self.max_bytes is not None and self._memory_bytes > self.max_bytes:
+            if not self.spill:
+                raise MemoryLimitError(
+                    f"Item errors exceed the memory limit. Got {len(self)} errors of about {self.bytes} bytes, limit {self.max_bytes} bytes."
+                )
+            self._spill()
+
+    def extend(self, errors: Iterable[ItemError]) -> None:
+        """Add item errors."""
+        for error in errors:
+            self.append(error)
+
+    def _spill(self) -> None:
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(  # noqa: SIM115
+                "w+", encoding="utf-8", dir=self.spill_dir
+            )
+        for error in self._errors:
+            self._spill_file.write(encode_error(error))
+        self.spilled += len(self._errors)
+        self._errors.clear()
+        self._memory_bytes = 0
+
+    def __len__(self) -> int:
+        """Number of item errors."""
+        return self.spilled + len(self._errors)
+
+    def __bool__(self) -> bool:
+        """True when there are item errors."""
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[ItemError]:
+        """Item errors in item order, reading spilled errors back from disk.
+
+        Spilled errors are read back from JSON, so exception objects in the error context are strings.
+        """
+        spill_file = self._spill_file
+        if spill_file is not None:
+            position = 0
+            while True:
+                spill_file.seek(position)
+                line = spill_file.readline()
+                position = spill_file.tell()
+                spill_file.seek(0, 2)
+                if not line:
+                    break
+                yield decode_error(line)
+        yield from list(self._errors)
+
+    def tail(self, count: int) -> list[ItemError]:
+        """The last count item errors, in item order."""
+        if count <= 0:
+            return []
+        if count <= len(self._errors):
+            return self._errors[-count:]
+        return list(islice(iter(self), len(self) - count, None))
+
+    def __getitem__(self, index: int) -> ItemError:
+        """Item error at index, in item order."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Item error index out of range.")
+        if index >= self.spilled:
+            return self._errors[index - self.spilled]
+        return next(islice(iter(self), index, None))
+
+    def __repr__(self) -> str:
+        return f"ErrorStore(errors={len(self)}, bytes={self.bytes}, spilled={self.spilled})"
+
+    def close(self) -> None:
+        """Remove the spill file."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
@@ -0,0 +1,94 @@
+"""Item results.
+
+Validation of single items without raising: the result holds either the validated item
+or its errors as InitErrorDetails, and a ValidationError is only built when asked for.
+
+Schemas with a rule_errors method are validated by Pydantic with the cross-field rules
+deferred, and the rules are then run on the model, so items that only break
+cross-field rules are reported without any exception being raised.
+Errors found by Pydantic are taken from its ValidationError, which is kept with the
+result; both kinds of errors have the same shape as those of model_validate.
+
+Example:
+    result = check_item(CreditTransfer, item, context)
+    if not result.valid:
+        errors.extend(result.errors)
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import ErrorDetails, InitErrorDetails
+
+from ..utils.validation_context import EMPTY_CONTEXT, ReportContext, item_context
+
+
+@dataclass(frozen=True, slots=True)
+class ItemResult:
+    """Validated item, or the errors of the item."""
+
+    schema: type[BaseModel]
+    model: BaseModel | None = None
+    errors: list[InitErrorDetails] = field(default_factory=list)
+    validation_error: ValidationError | None = None
+
+    @property
+    def valid(self) -> bool:
+        """True when the item is valid."""
+        return self.model is not None
+
+    def exception(self) -> ValidationError:
+        """ValidationError of the errors."""
+        if self.validation_error is not None:
+            return self.validation_error
+        return ValidationError.from_exception_data(self.schema.__name__, self.errors)
+
+    def error_details(self) -> list[ErrorDetails]:
+        """Errors with messages, as reported by ValidationError.errors."""
+        return self.exception().errors() if self.errors else []
+
+    def unwrap(self) -> BaseModel:
+        """Validated item, raises ValidationError when the item is invalid."""
+        if self.model is None:
+            raise self.exception()
+        return self.model
+
+
+def init_error_details(errors: list[ErrorDetails]) -> list[InitErrorDetails]:
+    """Errors of a ValidationError as InitErrorDetails."""
+    details: list[InitErrorDetails] = []
+    for error in errors:
+        init_error: InitErrorDetails = {
+            "type": error["type"],
+            "loc": error["loc"],
+            "input": error["input"],
+        }
+        if "ctx" in error:
+            init_error["ctx"] = error["ctx"]
+        details.append(init_error)
+    return details
+
+
+def check_item(
+    schema: type[BaseModel],
+    item: dict[str, Any],
+    context: ReportContext = EMPTY_CONTEXT,
+) -> ItemResult:
+    """Validate item against schema, the errors are returned and never raised.
+
+    Pydantic reports field errors only as a ValidationError built by pydantic-core,
+    so the validator is called directly and its error is caught here once.
+    """
+    has_rules = hasattr(schema, "rule_errors")
+    if has_rules and not context.deferred_rules:
+        context = replace(context, deferred_rules=True)
+    try:
+        model = schema.__pydantic_validator__.validate_python(item, context=context)
+    except ValidationError as e:
+        return ItemResult(schema, None, init_error_details(e.errors()), e)
+    if has_rules:
+        errors = model.rule_errors(item_context(model, context))  # type: ignore[attr-defined]
+        if errors:
+            return ItemResult(schema, None, errors)
+    return ItemResult(schema, model)
@@ -0,0 +1,350 @@
+"""Item store.
+
+Optional pipeline stage writing validated items to a local SQLite file, for example one file per period,
+so that validated data can be queried without reading the report files again.
+
+Every item schema has a table named after the schema, with a column of the SQLite type of each schema field
+and the report and reporter_id of the item. Integer fields and integer codes are INTEGER columns,
+float fields REAL, and decimals, dates, timestamps and string codes TEXT in their JSON form,
+so values are stored exactly and ISO dates compare in date order.
+Items are inserted in large batches in one transaction per batch,
+and the indexes on id, payment type, day and key dimensions are created when the store is closed.
+
+Example:
+    ReportValidator(stages=[ItemStore(period_path(directory, "2025-03"))]).validate(path)
+    with ItemStore(period_path(directory, "2025-03")) as store:
+        rows = store.select(CreditTransfer, reporter_id="556000-0000", sni_code="64190",
+                            day_from="2025-03-01", day_to="2025-03-31")
+"""
+
+import json
+import sqlite3
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from operator import itemgetter, methodcaller
+from pathlib import Path
+from typing import Any, Self, get_args
+
+from pydantic import BaseModel, PastDate
+
+from ..utils.item_fields import field_value_type
+from .partition import DAY_FIELDS
+
+DEFAULT_BATCH_ROWS = 50_000
+INDEXED_FIELDS = (
+    "id",
+    "payment_type",
+    *DAY_FIELDS,
+    "sni_code",
+    "merchant_category",
+    "counterparty_country",
+    "payment_scheme",
+)
+_REPORT_COLUMNS = ("report_id", "reporter_id")
+
+
+def column_type(value_type: Any) -> str:
+    """SQLite column type of values of a schema field."""
+    if value_type is bool or value_type is int:
+        return "INTEGER"
+    if value_type is float:
+        return "REAL"
+    return "TEXT"
+
+
+def sql_value(value: Any) -> Any:
+    """SQLite value of a validated field value."""
+    if isinstance(value, Enum):
+        value = value.value
+    if value is None or isinstance(value, int | float | str):
+        return value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    return json.dumps(value, default=str)
+
+
+def _has_plain_enum(annotation: Any) -> bool:
+    """True for enums without a str or int mixin, which SQLite does not bind as their values."""
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return not issubclass(annotation, str | int)
+    return any(_has_plain_enum(arg) for arg in get_args(annotation))
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def field_converter(annotation: Any) -> Callable[[Any], Any] | None:
+    """Converter of the non-null values of a schema field to SQLite values, None when stored as they are."""
+    value_type = field_value_type(annotation)
+    if _has_plain_enum(annotation):
+        return _enum_value
+    if value_type is Decimal:
+        return str
+    if value_type is PastDate or (
+        isinstance(value_type, type) and issubclass(value_type, date)
+    ):
+        return methodcaller("isoformat")
+    if value_type in (str, int, float, bool):
+        return None
+    return sql_value
+
+
+def period_path(directory: str | Path, period: str) -> Path:
+    """Store file of a period in directory."""
+    return Path(directory) / f"items_{period}.sqlite"
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class ItemStore:
+    """SQLite store of validated items.
+
+    Used as a pipeline stage, the report header is recorded when validation of the items starts,
+    and every valid item is stored with the report.
+    """
+
+    def __init__(self, path: str | Path, batch_rows: int = DEFAULT_BATCH_ROWS) -> None:
+        """Open or create the store at path, inserting items in batches of batch_rows."""
+        self.path = Path(path)
+        self.batch_rows = batch_rows
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS reports (
+                report_id INTEGER PRIMARY KEY,
+                reporter_id TEXT NOT NULL,
+                actor_id TEXT,
+                report_part TEXT,
+                report_type TEXT NOT NULL,
+                header TEXT NOT NULL
+            );
+            """
+        )
+        self._columns: dict[type[BaseModel], list[str]] = {}
+        self._getters: dict[
+            type[BaseModel], Callable[[dict[str, Any]], tuple[Any, ...]]
+        ] = {}
+        self._converters: dict[
+            type[BaseModel], list[tuple[int, Callable[[Any], Any]]]
+        ] = {}
+        self._statements: dict[type[BaseModel], str] = {}
+        self._rows: dict[type[BaseModel], list[list[Any]]] = {}
+        self._buffered = 0
+        self._inserted: set[type[BaseModel]] = set()
+        self._report: tuple[int, str] | None = None
+        self._closed = False
+
+    def __enter__(self) -> Self:
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        """Write buffered items, create indexes and close the store."""
+        self.close()
+
+    def start_report(self, report: BaseModel) -> None:
+        """Record a validated report header, the items added after it belong to the report."""
+        self.flush()
+        header = report.model_dump(mode="json", exclude={"items"})
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO reports (reporter_id, actor_id, report_part, report_type, header) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    header["reporter_id"],
+                    header.get("actor_id"),
+                    header.get("report_part"),
+                    report.__class__.__name__,
+                    json.dumps(header),
+                ),
+            )
+        self._report = (cursor.lastrowid, header["reporter_id"])  # type: ignore[assignment]
+
+    def table(self, schema: type[BaseModel]) -> list[str]:
+        """Create the table of schema when missing, returns its field columns."""
+        columns = self._columns.get(schema)
+        if columns is not None:
+            return columns
+        columns = list(schema.model_fields)
+        definitions = [
+            "report_id INTEGER NOT NULL REFERENCES reports",
+            "reporter_id TEXT NOT NULL",
+            *(
+                f"{_quote(name)} {column_type(field_value_type(field.annotation))}"
+                for name, field in schema.model_fields.items()
+            ),
+        ]
+        table = _quote(schema.__name__)
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(definitions)})"
+        )
+        names = ", ".join(_quote(name) for name in (*_REPORT_COLUMNS, *columns))
+        placeholders = ", ".join("?" * (len(columns) + len(_REPORT_COLUMNS)))
+        self._statements[schema] = (
+            f"INSERT INTO {table} ({names}) VALUES ({placeholders})"
+        )
+        self._getters[schema] = itemgetter(*columns)
+        self._converters[schema] = [
+            (position, converter)
+            for position, field in enumerate(
+                schema.model_fields.values(), len(_REPORT_COLUMNS)
+            )
+            if (converter := field_converter(field.annotation)) is not None
+        ]
+        self._columns[schema] = columns
+        self._rows[schema] = []
+        return columns
+
+    def add(self, item: BaseModel) -> None:
+        """Add a validated item of the current report."""
+        if self._report is None:
+            raise ValueError(
+                "No report started. Call start_report before adding items."
+            )
+        schema = item.__class__
+        if schema not in self._columns:
+            self.table(schema)
+        row = [*self._report, *self._getters[schema](item.__dict__)]
+        for position, convert in self._converters[schema]:
+            value = row[position]
+            if value is not None:
+                row[position] = convert(value)
+        self._rows[schema].append(row)
+        self._buffered += 1
+        if self._buffered >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Insert the buffered items in one transaction."""
+        if not self._buffered:
+            return
+        with self.connection:
+            for schema, rows in self._rows.items():
+                if rows:
+                    self.connection.executemany(self._statements[schema], rows)
+                    self._inserted.add(schema)
+                    rows.clear()
+        self._buffered = 0
+
+    def create_indexes(self) -> None:
+        """Create the indexes of the tables, when missing.
+
+        The tables that received rows since the last call are analyzed for the query planner.
+        """
+        with self.connection:
+            for schema, columns in self._columns.items():
+                table = schema.__name__
+                indexed = [name for name in INDEXED_FIELDS if name in columns]
+                days = [name for name in DAY_FIELDS if name in columns]
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote(f'{table}_report_id')} "
+                    f"ON {_quote(table)} (report_id)"
+                )
+                for name in indexed:
+                    self.connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS {_quote(f'{table}_{name}')} "
+                        f"ON {_quote(table)} ({_quote(name)})"
+                    )
+                for name in days:
+                    self.connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS {_quote(f'{table}_reporter_id_{name}')} "
+                        f"ON {_quote(table)} (reporter_id, {_quote(name)})"
+                    )
+            for schema in self._inserted:
+                self.connection.execute(f"ANALYZE {_quote(schema.__name__)}")
+        self._inserted.clear()
+
+    def close(self) -> None:
+        """Insert the remaining items, create the indexes and close the store.
+
+        Called when all items have been validated, closing a closed store does nothing.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._report = None
+        try:
+            self.flush()
+            self.create_indexes()
+        finally:
+            self.connection.close()
+
+    def select(
+        self,
+        schema: type[BaseModel],
+        day_from: date | str | None = None,
+        day_to: date | str | None = None,
+        limit: int | None = None,
+        **equals: Any,
+    ) -> list[dict[str, Any]]:
+        """Stored items of schema as rows, with day fields from day_from to day_to
+        and columns equal to the values in equals, for example reporter_id or payment_type.
+
+        Raises ValueError for columns the table does not have.
+        """
+        table = schema.__name__
+        columns = {
+            row[1]
+            for row in self.connection.execute(f"PRAGMA table_info({_quote(table)})")
+        }
+        if not columns:
+            return []
+        conditions: list[str] = []
+        parameters: list[Any] = []
+        for name, value in equals.items():
+            if name not in columns:
+                raise ValueError(
+                    f"Unknown column. Got {name}, expected one of {sorted(columns)}."
+                )
+            conditions.append(f"{_quote(name)} = ?")
+            parameters.append(sql_value(value))
+        if day_from is not None or day_to is not None:
+            day = next((name for name in DAY_FIELDS if name in columns), None)
+            if day is None:
+                raise ValueError(
+                    f"Table {table} has no day column, expected one of {DAY_FIELDS}."
+                )
+            if day_from is not None:
+                conditions.append(f"{_quote(day)} >= ?")
+                parameters.append(sql_value(day_from))
+            if day_to is not None:
+                # Before the next day, so timestamps on day_to are included.
+                conditions.append(f"{_quote(day)} < ?")
+                parameters.append(
+                    (
+                        date.fromisoformat(str(day_to)[:10]) + timedelta(days=1)
+                    ).isoformat()
+                )
+        sql = f"SELECT * FROM {_quote(table)}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        cursor = self.connection.execute(sql, parameters)
+        names = [description[0] for description in cursor.description]
+        return [dict(zip(names, row, strict=True)) for row in cursor]
+
+    def counts(self) -> dict[str, int]:
+        """Number of stored items per table."""
+        tables = [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND name != 'reports' AND name NOT LIKE 'sqlite%'"
+            )
+        ]
+        return {
+            table: self.connection.execute(
+                f"SELECT count(*) FROM {_quote(table)}"
+            ).fetchone()[0]
+            for table in tables
+        }
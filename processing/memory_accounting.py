@@ -0,0 +1,47 @@
+"""Memory accounting.
+
+Limits and statistics for the memory held by a report validation run:
+bytes parsed from the input, items being validated, and the size of the stored item errors.
+With limits, many reports can be validated concurrently on one host without running out of memory.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+
+class MemoryLimitError(RuntimeError):
+    """Raised when a validation run exceeds one of its memory limits."""
+
+
+@dataclass(frozen=True, slots=True)
+class MemoryLimits:
+    """Memory limits of a validation run.
+
+    max_input_bytes:    abort when more bytes have been parsed from the report
+    max_live_items:     most items held by the validator at once, bounding the batches in flight
+    max_error_bytes:    most estimated bytes of item errors in memory,
+                        above which errors are spilled to a temporary file in spill_dir,
+                        or the run is aborted when spill_errors is False
+    """
+
+    max_input_bytes: int | None = None
+    max_live_items: int | None = None
+    max_error_bytes: int | None = None
+    spill_errors: bool = True
+    spill_dir: str | Path | None = None
+
+
+NO_LIMITS = MemoryLimits()
+
+
+@dataclass(frozen=True, slots=True)
+class ValidationStats:
+    """Memory statistics of a validation run."""
+
+    bytes_parsed: int
+    items: int
+    live_items: int
+    peak_live_items: int
+    errors: int
+    error_bytes: int
+    spilled_errors: int
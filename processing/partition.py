@@ -0,0 +1,155 @@
+"""Day partitioning of validated items.
+
+Pipeline stage that partitions validated items by day, and optionally by payment type,
+into spill files while the report is validated.
+Reading the partitions in key order gives day-ordered output without a full sort,
+and several partitioners (for example one per report_part) can be merged into one day-ordered stream.
+"""
+
+import heapq
+import json
+from collections.abc import Iterator
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+DEFAULT_BUFFER_ITEMS = 100_000
+DAY_FIELDS = ("transaction_day", "transaction_cleared", "transaction_time")
+
+type PartitionKey = tuple[str, str]
+
+
+def item_day(item: BaseModel) -> date:
+    """Day of a transaction or aggregate item."""
+    for name in DAY_FIELDS:
+        value = getattr(item, name, None)
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+    raise ValueError(
+        f"Item {item.__class__.__name__} has no day field, expected one of {DAY_FIELDS}."
+    )
+
+
+class DayPartitioner:
+    """Day partitioner.
+
+    Items are buffered in memory and appended to one spill file per partition key
+    when more than buffer_items items are buffered,
+    so memory is bounded regardless of report size.
+    A spill file left in directory by an earlier run is replaced when its partition is first written.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        by_payment_type: bool = False,
+        buffer_items: int = DEFAULT_BUFFER_ITEMS,
+    ) -> None:
+        """Set up partitioner writing spill files to directory."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.by_payment_type = by_payment_type
+        self.buffer_items = buffer_items
+        self.buffers: dict[PartitionKey, list[str]] = {}
+        self.buffered = 0
+        self.counts: dict[PartitionKey, int] = {}
+
+    def partition_key(self, item: BaseModel) -> PartitionKey:
+        """Partition key (day, payment_type) of item, payment_type is empty unless partitioned by payment type."""
+        payment_type = getattr(item, "payment_type", "") if self.by_payment_type else ""
+        return item_day(item).isoformat(), str(payment_type)
+
+    def path(self, key: PartitionKey) -> Path:
+        """Spill file of a partition."""
+        day, payment_type = key
+        return self.directory / f"{day}_{payment_type or 'all'}.jsonl"
+
+    def add(self, item: BaseModel) -> None:
+        """Add validated item to its partition."""
+        key = self.partition_key(item)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = []
+        buffer.append(item.model_dump_json())
+        self.buffered += 1
+        if self.buffered >= self.buffer_items:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append buffered items to the spill files."""
+        for key, lines in self.buffers.items():
+            mode = "a" if key in self.counts else "w"
+            with open(self.path(key), mode, encoding="utf-8") as fp:
+                fp.write("\n".join(lines))
+                fp.write("\n")
+            self.counts[key] = self.counts.get(key, 0) + len(lines)
+        self.buffers.clear()
+        self.buffered = 0
+
+    def close(self) -> None:
+        """Flush remaining items."""
+        self.flush()
+
+    def checkpoint_state(self) -> dict[str, Any]:
+        """Flush buffered items and return the partitions, to be restored with restore_state."""
+        self.flush()
+        return {
+            "partitions": [
+                [
+                    day,
+                    payment_type,
+                    count,
+                    self.path((day, payment_type)).stat().st_size,
+                ]
+                for (day, payment_type), count in self.counts.items()
+            ]
+        }
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        """Restore the partitions returned by checkpoint_state, removing items added after it.
+
+        Only the spill files of the partitions in state are touched. Spill files of partitions
+        created after the checkpoint are left alone and overwritten when written again.
+        """
+        self.buffers.clear()
+        self.buffered = 0
+        self.counts = {}
+        for day, payment_type, count, size in state["partitions"]:
+            self.counts[day, payment_type] = count
+            with open(self.path((day, payment_type)), "r+b") as fp:
+                fp.truncate(size)
+
+    def keys(self) -> list[PartitionKey]:
+        """Partition keys in day order."""
+        return sorted(self.counts)
+
+    def iter_partition(self, key: PartitionKey) -> Iterator[dict[str, Any]]:
+        """Items of one partition, in validation order."""
+        with open(self.path(key), encoding="utf-8") as fp:
+            for line in fp:
+                yield json.loads(line)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """All items in day order, a sequential scan of the partitions."""
+        for key in self.keys():
+            yield from self.iter_partition(key)
+
+    def iter_keyed(self) -> Iterator[tuple[PartitionKey, dict[str, Any]]]:
+        """All items in day order with their partition key."""
+        for key in self.keys():
+            for item in self.iter_partition(key):
+                yield key, item
+
+
+def merge_partitions(
+    *partitioners: DayPartitioner,
+) -> Iterator[tuple[PartitionKey, dict[str, Any]]]:
+    """Merge several partitioners into one day-ordered stream of (key, item)."""
+    return heapq.merge(
+        *(partitioner.iter_keyed() for partitioner in partitioners),
+        key=lambda keyed: keyed[0],
+    )
@@ -0,0 +1,376 @@
+"""Plausibility checks.
+
+Compares the volumes of a new report with the reports previously accepted from the same reporter,
+period over period, to find reports that are valid but implausible,
+for example the number_of ATMs dropping by 90% from one quarter to the next.
+
+For ATMs, DirectDebits, EMoney and TransactionsInPaymentSystems reports, the report is read once,
+and the sums of number_of, transaction_value and value_of_transactions are computed in total
+and per value of every dimension field (for example payment_type=DD or counterparty_country=SE).
+Every sum is compared with rolling statistics of the same sum in the accepted reports:
+count, mean and variance by Welford's method, and the sum of the previous period.
+The statistics are kept in a small JSON file, so no report history is read.
+
+Example:
+    engine = PlausibilityEngine(PlausibilityStore.load(path))
+    result = engine.check(report_path)  # or engine.check(*report_part_paths)
+    if result.is_plausible:
+        engine.accept(result)
+        engine.store.save(path)
+"""
+
+import json
+import math
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import IO, Any, Self
+
+from ..utils.type_mapping import VALIDATOR_MAPPING
+from .compact_rows import report_items
+from .partition import DAY_FIELDS
+from .report_stream import ReportStream
+from .report_validator import REPORTED_TYPE_FIELDS, report_family
+
+STORE_VERSION = 1
+PLAUSIBILITY_SCHEMAS = (
+    "ATMs",
+    "DirectDebits",
+    "EMoney",
+    "TransactionsInPaymentSystems",
+)
+MEASURE_FIELDS = ("number_of", "transaction_value", "value_of_transactions")
+# Fields that identify an item or a report period and are not dimensions.
+_NON_DIMENSION_FIELDS = (
+    "id",
+    "reported_payment_type",
+    "date_from",
+    "date_to",
+    *DAY_FIELDS,
+)
+
+# Dimension field and value, both empty for the report total, and measure field.
+type SeriesKey = tuple[str, str, str]
+
+
+class RunningStats:
+    """Count, mean and variance of a series by Welford's method, and its latest value."""
+
+    __slots__ = ("count", "last", "last_period", "m2", "mean")
+
+    def __init__(
+        self,
+        count: int = 0,
+        mean: float = 0.0,
+        m2: float = 0.0,
+        last: float | None = None,
+        last_period: str | None = None,
+    ) -> None:
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.last = last
+        self.last_period = last_period
+
+    def add(self, value: float, period: str) -> None:
+        """Add the value of a period."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.last = value
+        self.last_period = period
+
+    def remove_last(self) -> None:
+        """Remove the value of the latest period, when it is replaced by a new report of the period."""
+        if self.last is None:
+            return
+        value = self.last
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        else:
+            mean = (self.count * self.mean - value) / (self.count - 1)
+            self.m2 = max(self.m2 - (value - mean) * (value - self.mean), 0.0)
+            self.mean = mean
+            self.count -= 1
+        self.last = None
+        self.last_period = None
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation, 0 with fewer than two values."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_list(self) -> list[Any]:
+        return [self.count, self.mean, self.m2, self.last, self.last_period]
+
+
+def dimension_fields(schema_name: str) -> list[str]:
+    """Dimension fields of an item schema, the fields that are not measures or identifiers."""
+    schema = next(
+        schema
+        for schema in VALIDATOR_MAPPING.values()
+        if schema.__name__ == schema_name
+    )
+    return [
+        name
+        for name in schema.model_fields
+        if name not in MEASURE_FIELDS and name not in _NON_DIMENSION_FIELDS
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class Deviation:
+    """Implausible sum of a report.
+
+    z is the deviation from the mean of the accepted periods in standard deviations,
+    change the relative change from the previous period, None when not compared.
+    """
+
+    dimension: str
+    value: str
+    measure: str
+    observed: float
+    mean: float
+    std: float
+    previous: float | None
+    z: float | None
+    change: float | None
+
+
+@dataclass
+class PlausibilityResult:
+    """Sums of a report and their deviations from the accepted reports."""
+
+    reporter_id: str
+    schema: str
+    period: str
+    sums: dict[SeriesKey, float] = field(default_factory=dict)
+    deviations: list[Deviation] = field(default_factory=list)
+
+    @property
+    def is_plausible(self) -> bool:
+        """True when no sum deviates."""
+        return not self.deviations
+
+
+class PlausibilityStore:
+    """Rolling statistics per reporter, item schema and series."""
+
+    def __init__(self) -> None:
+        self.stats: dict[tuple[str, str], dict[SeriesKey, RunningStats]] = {}
+
+    def series(self, reporter_id: str, schema: str) -> dict[SeriesKey, RunningStats]:
+        """Statistics of the series of a reporter and item schema."""
+        return self.stats.setdefault((reporter_id, schema), {})
+
+    def save(self, path: str | Path) -> None:
+        """Write the statistics to path, replacing any previous file atomically."""
+        state = {
+            "version": STORE_VERSION,
+            "stats": [
+                [reporter_id, schema, *key, *stats.to_list()]
+                for (reporter_id, schema), series in self.stats.items()
+                for key, stats in series.items()
+            ],
+        }
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> Self:
+        """Statistics written by save, empty when path does not exist."""
+        store = cls()
+        path = Path(path)
+        if not path.exists():
+            return store
+        state = json.loads(path.read_text(encoding="utf-8"))
+        if state.get("version") != STORE_VERSION:
+            raise ValueError(
+                f"Unsupported plausibility store version. Got {state.get('version')}, expected {STORE_VERSION}."
+            )
+        for reporter_id, schema, dimension, value, measure, *stats in state["stats"]:
+            store.series(reporter_id, schema)[dimension, value, measure] = RunningStats(
+                *stats
+            )
+        return store
+
+
+def report_sums(items: Iterable[Any], dimensions: list[str]) -> dict[SeriesKey, float]:
+    """Sums of the measures in total and per value of every dimension field."""
+    sums: dict[SeriesKey, Decimal] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        for measure in MEASURE_FIELDS:
+            value = item.get(measure)
+            if value is None:
+                continue
+            try:
+                number = Decimal(value if isinstance(value, str) else str(value))
+            except (InvalidOperation, TypeError, ValueError):
+                continue
+            if not number.is_finite():
+                continue
+            keys: list[SeriesKey] = [("", "", measure)]
+            keys.extend(
+                (dimension, str(item[dimension]), measure)
+                for dimension in dimensions
+                if item.get(dimension) is not None
+            )
+            for key in keys:
+                sums[key] = sums.get(key, Decimal(0)) + number
+    return {key: float(total) for key, total in sums.items()}
+
+
+class PlausibilityEngine:
+    """Plausibility checks of reports against the rolling statistics of a store.
+
+    A sum deviates when it changed by more than max_change (a fraction, 0.5 for 50%)
+    from the previous period, or when it is more than max_z standard deviations
+    and more than min_change from the mean of at least min_periods accepted periods,
+    so that series with little variance are not flagged for small changes.
+    Sums of the previous period that are missing in the report are compared as 0.
+    """
+
+    def __init__(
+        self,
+        store: PlausibilityStore,
+        max_z: float = 4.0,
+        max_change: float = 0.5,
+        min_change: float = 0.1,
+        min_periods: int = 3,
+    ) -> None:
+        self.store = store
+        self.max_z = max_z
+        self.max_change = max_change
+        self.min_change = min_change
+        self.min_periods = min_periods
+
+    def check(self, *sources: str | Path | IO[Any]) -> PlausibilityResult:
+        """Sums and deviations of a report, read in one streaming pass per source.
+
+        A report split into report_part files is checked with all its parts as sources,
+        and the sums of the parts are added, so the report is compared as a whole.
+        Raises ValueError for reports of other item schemas than PLAUSIBILITY_SCHEMAS,
+        for headers without reporter_id or period, and for parts of different reports
+        or a part given twice.
+        """
+        if not sources:
+            raise ValueError("No report to check. Expected at least one source.")
+        result, report_part = self._read_sums(sources[0])
+        parts = {report_part}
+        for source in sources[1:]:
+            part, report_part = self._read_sums(source)
+            report = (part.reporter_id, part.schema, part.period)
+            if report != (result.reporter_id, result.schema, result.period):
+                raise ValueError(
+                    f"Malformed report parts. Expected parts of {result.reporter_id}, "
+                    f"{result.schema}, {result.period}. Got {', '.join(report)}."
+                )
+            if report_part in parts:
+                raise ValueError(
+                    f"Malformed report parts. Expected every report_part once. Got {report_part} twice."
+                )
+            parts.add(report_part)
+            for series_key, total in part.sums.items():
+                result.sums[series_key] = result.sums.get(series_key, 0.0) + total
+        sums, period = result.sums, result.period
+        series = self.store.stats.get((result.reporter_id, result.schema), {})
+        for key in sums.keys() | series.keys():
+            stats = series.get(key)
+            if stats is None:
+                continue
+            deviation = self._deviation(
+                key, sums.get(key, 0.0), stats, stats.last_period == period
+            )
+            if deviation is not None:
+                result.deviations.append(deviation)
+        result.deviations.sort(
+            key=lambda deviation: (
+                deviation.dimension,
+                deviation.value,
+                deviation.measure,
+            )
+        )
+        return result
+
+    def _read_sums(
+        self, source: str | Path | IO[Any]
+    ) -> tuple[PlausibilityResult, str | None]:
+        """Sums of a report without deviations, and its report_part."""
+        with ReportStream(source) as stream:
+            header = stream.read_header()
+            family = report_family(header)
+            schema = VALIDATOR_MAPPING.get(header.get(REPORTED_TYPE_FIELDS[family]))  # type: ignore[arg-type]
+            if schema is None or schema.__name__ not in PLAUSIBILITY_SCHEMAS:
+                raise ValueError(
+                    f"No plausibility checks for report. Got {schema and schema.__name__}, "
+                    f"expected one of {list(PLAUSIBILITY_SCHEMAS)}."
+                )
+            sums = report_sums(report_items(stream), dimension_fields(schema.__name__))
+        reporter_id = header.get("reporter_id")
+        period = header.get("period") or header.get("date_from")
+        if not reporter_id or not period:
+            raise ValueError(
+                "Malformed report header. Expected reporter_id and period or date_from. "
+                f"Got reporter_id {reporter_id}, period {period}."
+            )
+        result = PlausibilityResult(
+            str(reporter_id), schema.__name__, str(period), sums
+        )
+        return result, header.get("report_part")
+
+    def _deviation(
+        self, key: SeriesKey, observed: float, stats: RunningStats, same_period: bool
+    ) -> Deviation | None:
+        if same_period:
+            # A report replacing the latest accepted period is compared without it,
+            # and only with the mean, as the period before it is not kept.
+            stats = RunningStats(*stats.to_list())
+            stats.remove_last()
+        if stats.count == 0:
+            return None
+        z = None
+        if stats.count >= self.min_periods and stats.std > 0:
+            z = (observed - stats.mean) / stats.std
+        change = None
+        if stats.last:
+            change = observed / stats.last - 1
+        deviates_from_mean = (
+            z is not None
+            and abs(z) > self.max_z
+            and abs(observed - stats.mean) > self.min_change * abs(stats.mean)
+        )
+        if not deviates_from_mean and (
+            change is None or abs(change) <= self.max_change
+        ):
+            return None
+        return Deviation(*key, observed, stats.mean, stats.std, stats.last, z, change)
+
+    def accept(self, result: PlausibilityResult) -> None:
+        """Add the sums of a checked report to the statistics.
+
+        A report of the latest accepted period replaces it.
+        Raises ValueError for a period before the latest accepted period.
+        """
+        series = self.store.series(result.reporter_id, result.schema)
+        latest = max(
+            (stats.last_period for stats in series.values() if stats.last_period),
+            default=None,
+        )
+        if latest is not None and result.period < latest:
+            raise ValueError(
+                f"Period is before the latest accepted period. Got {result.period}, latest {latest}."
+            )
+        for key in result.sums.keys() | series.keys():
+            stats = series.get(key)
+            if stats is None:
+                stats = series[key] = RunningStats()
+            elif stats.last_period == result.period:
+                stats.remove_last()
+            stats.add(result.sums.get(key, 0.0), result.period)
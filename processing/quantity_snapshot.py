@@ -0,0 +1,188 @@
+"""Quantity items snapshot builder.
+
+Keeps running stock counts for the quantity items, Section 3 in the regulations,
+from inventory delta events (terminal added or removed, card issued or cancelled),
+and emits a validated quantity items report for any period end without rescanning the event history.
+"""
+
+import calendar
+import json
+import os
+from collections.abc import Iterable, Mapping
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Self
+
+from pydantic import BaseModel
+
+from ..enums.full_enums import QuantityItems
+from ..schemas.quantity_items_report_schema import QuantityItemsReport
+from ..utils.field_validaton_functions import validate_quarterly
+from ..utils.type_mapping import VALIDATOR_MAPPING
+
+CHECKPOINT_VERSION = 1
+
+_NON_DIMENSION_FIELDS = ("id", "number_of", "quantity_item")
+
+type DimensionKey = tuple[Any, ...]
+
+
+def quarter_end(day: date) -> date:
+    """Last day in the quarter of day."""
+    month = (day.month - 1) // 3 * 3 + 3
+    return date(day.year, month, calendar.monthrange(day.year, month)[1])
+
+
+class QuantitySnapshotBuilder:
+    """Quantity items snapshot builder.
+
+    Deltas are accumulated per quarter and per dimension tuple,
+    so the stock at any quarter end is the sum of the deltas in the quarters up to and including it.
+    Memory is proportional to the number of quarters times the number of distinct dimension tuples.
+    """
+
+    def __init__(self, quantity_item: QuantityItems | str) -> None:
+        """Set up builder for one quantity item."""
+        self.quantity_item = QuantityItems(quantity_item)
+        self.schema: type[BaseModel] = VALIDATOR_MAPPING[self.quantity_item]
+        self.dimensions = tuple(
+            name
+            for name in self.schema.model_fields
+            if name not in _NON_DIMENSION_FIELDS
+        )
+        self._dimension_names = frozenset(self.dimensions)
+        self.deltas: dict[date, dict[DimensionKey, int]] = {}
+        self._canonical_keys: dict[DimensionKey, DimensionKey] = {}
+
+    def apply(self, day: date | str, delta: int, **dimensions: Any) -> None:
+        """Apply a stock change on day for the dimension tuple."""
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        key = self._canonical_key(dimensions)
+        period_deltas = self.deltas.setdefault(quarter_end(day), {})
+        period_deltas[key] = period_deltas.get(key, 0) + delta
+
+    def apply_events(self, events: Iterable[Mapping[str, Any]]) -> None:
+        """Apply events with the keys day, delta and the dimensions of the quantity item."""
+        for event in events:
+            dimensions = {k: v for k, v in event.items() if k not in ("day", "delta")}
+            self.apply(event["day"], event["delta"], **dimensions)
+
+    def snapshot(self, period: date | str) -> dict[DimensionKey, int]:
+        """Stock counts per dimension tuple at the end of the quarter period."""
+        period = validate_quarterly(str(period))
+        counts: dict[DimensionKey, int] = {}
+        for period_end, period_deltas in self.deltas.items():
+            if period_end > period:
+                continue
+            for key, delta in period_deltas.items():
+                counts[key] = counts.get(key, 0) + delta
+        return {key: count for key, count in counts.items() if count}
+
+    def items(self, period: date | str) -> list[BaseModel]:
+        """Validated quantity items at the end of period."""
+        return [
+            self.schema.model_validate(
+                {
+                    "id": f"{self.quantity_item}-{period}-{index}",
+                    "number_of": count,
+                    "quantity_item": self.quantity_item,
+                    **dict(zip(self.dimensions, key, strict=True)),
+                }
+            )
+            for index, (key, count) in enumerate(
+                sorted(self.snapshot(period).items(), key=lambda kv: str(kv[0])),
+                start=1,
+            )
+        ]
+
+    def report(
+        self,
+        period: date | str,
+        reporter_id: str,
+        environment: str,
+        report_datetime: datetime | str,
+        **header: Any,
+    ) -> QuantityItemsReport:
+        """Validated quantity items report for the half year ending at period."""
+        report_datetime = (
+            report_datetime
+            if isinstance(report_datetime, str)
+            else report_datetime.strftime("%Y-%m-%dT%H:%M:%S")
+        )
+        return QuantityItemsReport.model_validate(
+            {
+                "reporter_id": reporter_id,
+                "environment": environment,
+                "report_datetime": report_datetime,
+                "schema_version": "1.0",
+                "period": str(period),
+                "reported_quantity_item": self.quantity_item,
+                "items": [item.model_dump(mode="json") for item in self.items(period)],
+                **header,
+            }
+        )
+
+    def checkpoint(self, path: str | Path) -> None:
+        """Write the builder state to path, replacing any previous checkpoint atomically."""
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "quantity_item": self.quantity_item.value,
+            "dimensions": self.dimensions,
+            "deltas": {
+                period_end.isoformat(): [
+                    [*key, delta] for key, delta in period_deltas.items()
+                ]
+                for period_end, period_deltas in self.deltas.items()
+            },
+        }
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> Self:
+        """Restore a builder from a checkpoint written by checkpoint."""
+        state = json.loads(Path(path).read_text(encoding="utf-8"))
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Unsupported checkpoint version. Got {state.get('version')}, expected {CHECKPOINT_VERSION}."
+            )
+        builder = cls(state["quantity_item"])
+        if tuple(state["dimensions"]) != builder.dimensions:
+            raise ValueError(
+                f"Checkpoint dimensions {state['dimensions']} do not match {builder.dimensions}."
+            )
+        for period_end, rows in state["deltas"].items():
+            builder.deltas[date.fromisoformat(period_end)] = {
+                tuple(row[:-1]): row[-1] for row in rows
+            }
+        for period_deltas in builder.deltas.values():
+            builder._canonical_keys.update((key, key) for key in period_deltas)
+        return builder
+
+    def _canonical_key(self, dimensions: Mapping[str, Any]) -> DimensionKey:
+        """Validated dimension tuple, the schema is only run the first time a tuple is seen.
+
+        Raises ValueError for dimension names the quantity item does not have.
+        """
+        if not self._dimension_names.issuperset(dimensions):
+            unknown = set(dimensions) - self._dimension_names
+            raise ValueError(
+                f"Unknown dimensions for {self.quantity_item}: {sorted(unknown)}."
+            )
+        raw_key = tuple(dimensions.get(name) for name in self.dimensions)
+        key = self._canonical_keys.get(raw_key)
+        if key is None:
+            item = self.schema.model_validate(
+                {
+                    "id": "",
+                    "number_of": 0,
+                    "quantity_item": self.quantity_item,
+                    **dimensions,
+                }
+            ).model_dump(mode="json")
+            key = tuple(item[name] for name in self.dimensions)
+            self._canonical_keys[raw_key] = key
+        return key
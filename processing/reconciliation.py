@@ -0,0 +1,328 @@
+"""Reconciliation of card issuer and card acquirer reports.
+
+Card payment issuer and card payment acquirer reports from the same group often describe the same on-us transactions.
+The reconciliation compares number of transactions and transaction value per
+payment, merchant_category, payment_scheme, transaction_cleared day and transaction_currency,
+and reports the groups that do not match.
+
+Groups are computed by hash aggregation with a fixed maximum number of groups in memory.
+When the limit is exceeded, partial groups are spilled to partition files on disk,
+and the partitions are compared one at a time.
+"""
+
+import json
+import os
+import tempfile
+import zlib
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from ..enums.full_enums import PaymentType
+from ..schemas.card_transaction_schemas import CardPaymentAcquirer, CardPaymentIssuer
+from .report_stream import ReportStream
+
+DEFAULT_MAX_GROUPS = 500_000
+DEFAULT_PARTITIONS = 64
+
+# Issuer and acquirer payment types that describe the same transactions.
+# ATM cash withdrawals (CWI) are only reported by issuers and are not reconciled.
+RECONCILED_PAYMENT_TYPES: dict[str, str] = {
+    PaymentType.CPI: "CP",
+    PaymentType.CPA: "CP",
+    PaymentType.CADVI: "CADV",
+    PaymentType.CADVA: "CADV",
+}
+
+type GroupKey = tuple[str, str, str, str, str]
+
+
+@dataclass(slots=True)
+class GroupSummary:
+    """Number of transactions and transaction value for a group."""
+
+    number_of: int = 0
+    transaction_value: Decimal = Decimal(0)
+
+    def add(self, number_of: int, transaction_value: Decimal) -> None:
+        """Add to summary."""
+        self.number_of += number_of
+        self.transaction_value += transaction_value
+
+
+@dataclass(frozen=True, slots=True)
+class Mismatch:
+    """Group where the issuer and acquirer summaries differ."""
+
+    key: GroupKey
+    issuer: GroupSummary | None
+    acquirer: GroupSummary | None
+
+
+@dataclass
+class ReconciliationResult:
+    """Result of a reconciliation."""
+
+    mismatches: list[Mismatch] = field(default_factory=list)
+    matched_groups: int = 0
+    issuer_items: int = 0
+    acquirer_items: int = 0
+    invalid_issuer_items: int = 0
+    invalid_acquirer_items: int = 0
+
+
+def group_key(item: BaseModel) -> GroupKey | None:
+    """Reconciliation group of a validated card payment item, None when the item is not reconciled."""
+    payment = RECONCILED_PAYMENT_TYPES.get(item.payment_type)  # type: ignore[attr-defined]
+    if payment is None:
+        return None
+    return (
+        payment,
+        item.merchant_category,  # type: ignore[attr-defined]
+        item.payment_scheme.value,  # type: ignore[attr-defined]
+        item.transaction_cleared.isoformat(),  # type: ignore[attr-defined]
+        item.transaction_currency,  # type: ignore[attr-defined]
+    )
+
+
+def _partition(key: GroupKey, partitions: int) -> int:
+    """Partition of key, stable across processes."""
+    return zlib.crc32("\x1f".join(key).encode()) % partitions
+
+
+class GroupAggregator:
+    """Hash aggregation with a bounded number of groups in memory.
+
+    When more than max_groups groups are held,
+    all groups are appended to hash partition files in spill_dir and memory is cleared.
+    """
+
+    def __init__(
+        self,
+        spill_dir: str | Path,
+        name: str,
+        max_groups: int = DEFAULT_MAX_GROUPS,
+        partitions: int = DEFAULT_PARTITIONS,
+    ) -> None:
+        """Set up aggregator spilling to files named after name in spill_dir."""
+        self.spill_dir = Path(spill_dir)
+        self.name = name
+        self.max_groups = max_groups
+        self.partitions = partitions
+        self.groups: dict[GroupKey, GroupSummary] = {}
+        self.spilled = False
+
+    def add(self, key: GroupKey, number_of: int, transaction_value: Decimal) -> None:
+        """Add to group."""
+        summary = self.groups.get(key)
+        if summary is None:
+            if len(self.groups) >= self.max_groups:
+                self.spill()
+            summary = self.groups[key] = GroupSummary()
+        summary.add(number_of, transaction_value)
+
+    def partition_path(self, partition: int) -> Path:
+        """Path of the spill file for partition."""
+        return self.spill_dir / f"{self.name}-{partition:04d}.jsonl"
+
+    def spill(self) -> None:
+        """Append all groups in memory to the partition files."""
+        files: dict[int, Any] = {}
+        try:
+            for key, summary in self.groups.items():
+                partition = _partition(key, self.partitions)
+                fp = files.get(partition)
+                if fp is None:
+                    fp = files[partition] = open(  # noqa: SIM115
+                        self.partition_path(partition), "a", encoding="utf-8"
+                    )
+                fp.write(
+                    json.dumps(
+                        [*key, summary.number_of, str(summary.transaction_value)]
+                    )
+                    + "\n"
+                )
+        finally:
+            for fp in files.values():
+                fp.close()
+        self.groups.clear()
+        self.spilled = True
+
+
+def read_partition(path: Path) -> dict[GroupKey, GroupSummary]:
+    """Merge the partial groups of a spilled partition file."""
+    groups: dict[GroupKey, GroupSummary] = {}
+    if not path.exists():
+        return groups
+    with open(path, encoding="utf-8") as fp:
+        for line in fp:
+            *key, number_of, transaction_value = json.loads(line)
+            summary = groups.get(tuple(key))  # type: ignore[arg-type]
+            if summary is None:
+                summary = groups[tuple(key)] = GroupSummary()  # type: ignore[index]
+            summary.add(number_of, Decimal(transaction_value))
+    return groups
+
+
+def compare_groups(
+    issuer: dict[GroupKey, GroupSummary],
+    acquirer: dict[GroupKey, GroupSummary],
+) -> tuple[list[Mismatch], int]:
+    """Mismatching groups and number of matching groups."""
+    mismatches: list[Mismatch] = []
+    matched = 0
+    for key in issuer.keys() | acquirer.keys():
+        issuer_summary = issuer.get(key)
+        acquirer_summary = acquirer.get(key)
+        if issuer_summary == acquirer_summary:
+            matched += 1
+        else:
+            mismatches.append(Mismatch(key, issuer_summary, acquirer_summary))
+    return mismatches, matched
+
+
+def _aggregate_items(
+    items: Iterable[dict[str, Any]],
+    schema: type[BaseModel],
+    aggregator: GroupAggregator,
+) -> tuple[int, int]:
+    """Validate and aggregate items, returns number of items and number of invalid items."""
+    count = 0
+    invalid = 0
+    for count, item in enumerate(items, start=1):
+        try:
+            model = schema.model_validate(item)
+        except ValidationError:
+            invalid += 1
+            continue
+        if key := group_key(model):
+            aggregator.add(key, 1, model.transaction_value)  # type: ignore[attr-defined]
+    return count, invalid
+
+
+def _aggregate_report(
+    path: str | Path,
+    schema: type[BaseModel],
+    spill_dir: str,
+    name: str,
+    max_groups: int,
+    partitions: int,
+) -> tuple[dict[GroupKey, GroupSummary] | None, int, int]:
+    """Aggregate a report file, returns groups (None when spilled), number of items and invalid items."""
+    aggregator = GroupAggregator(spill_dir, name, max_groups, partitions)
+    with ReportStream(path) as stream:
+        count, invalid = _aggregate_items(stream.items(), schema, aggregator)
+    if aggregator.spilled:
+        aggregator.spill()
+        return None, count, invalid
+    return aggregator.groups, count, invalid
+
+
+def _compare_partition(spill_dir: str, partition: int) -> tuple[list[Mismatch], int]:
+    directory = Path(spill_dir)
+    return compare_groups(
+        read_partition(directory / f"issuer-{partition:04d}.jsonl"),
+        read_partition(directory / f"acquirer-{partition:04d}.jsonl"),
+    )
+
+
+def _spill_groups(
+    groups: dict[GroupKey, GroupSummary], spill_dir: str, name: str, partitions: int
+) -> None:
+    aggregator = GroupAggregator(spill_dir, name, partitions=partitions)
+    aggregator.groups = groups
+    aggregator.spill()
+
+
+def reconcile_card_reports(
+    issuer_report: str | Path,
+    acquirer_report: str | Path,
+    max_groups: int = DEFAULT_MAX_GROUPS,
+    partitions: int = DEFAULT_PARTITIONS,
+    max_workers: int | None = None,
+    spill_dir: str | Path | None = None,
+) -> ReconciliationResult:
+    """Reconcile a card payment issuer report against a card payment acquirer report.
+
+    Both reports are streamed and aggregated side by side in separate processes,
+    each holding at most max_groups groups in memory.
+    Spilled partitions are compared in parallel.
+    """
+    result = ReconciliationResult()
+    with tempfile.TemporaryDirectory(dir=spill_dir) as tmp_dir:
+        with ProcessPoolExecutor(max_workers=max_workers or 2) as executor:
+            issuer_future = executor.submit(
+                _aggregate_report,
+                issuer_report,
+                CardPaymentIssuer,
+                tmp_dir,
+                "issuer",
+                max_groups,
+                partitions,
+            )
+            acquirer_future = executor.submit(
+                _aggregate_report,
+                acquirer_report,
+                CardPaymentAcquirer,
+                tmp_dir,
+                "acquirer",
+                max_groups,
+                partitions,
+            )
+            issuer_groups, result.issuer_items, result.invalid_issuer_items = (
+                issuer_future.result()
+            )
+            acquirer_groups, result.acquirer_items, result.invalid_acquirer_items = (
+                acquirer_future.result()
+            )
+
+        if issuer_groups is not None and acquirer_groups is not None:
+            result.mismatches, result.matched_groups = compare_groups(
+                issuer_groups, acquirer_groups
+            )
+        else:
+            # At least one side spilled, partition the other side the same way.
+            if issuer_groups is not None:
+                _spill_groups(issuer_groups, tmp_dir, "issuer", partitions)
+            if acquirer_groups is not None:
+                _spill_groups(acquirer_groups, tmp_dir, "acquirer", partitions)
+
+            with ProcessPoolExecutor(
+                max_workers=max_workers or os.cpu_count()
+            ) as executor:
+                for mismatches, matched in executor.map(
+                    _compare_partition, [tmp_dir] * partitions, range(partitions)
+                ):
+                    result.mismatches.extend(mismatches)
+                    result.matched_groups += matched
+
+    result.mismatches.sort(key=lambda m: m.key)
+    return result
+
+
+def iter_mismatches(result: ReconciliationResult) -> Iterator[dict[str, Any]]:
+    """Mismatches as plain dicts, for reporting."""
+    for mismatch in result.mismatches:
+        payment, merchant_category, payment_scheme, day, currency = mismatch.key
+        yield {
+            "payment": payment,
+            "merchant_category": merchant_category,
+            "payment_scheme": payment_scheme,
+            "transaction_cleared": day,
+            "transaction_currency": currency,
+            "issuer_number_of": mismatch.issuer.number_of if mismatch.issuer else 0,
+            "issuer_transaction_value": str(
+                mismatch.issuer.transaction_value if mismatch.issuer else Decimal(0)
+            ),
+            "acquirer_number_of": (
+                mismatch.acquirer.number_of if mismatch.acquirer else 0
+            ),
+            "acquirer_transaction_value": str(
+                mismatch.acquirer.transaction_value if mismatch.acquirer else Decimal(0)
+            ),
+        }
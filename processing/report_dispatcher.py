@@ -0,0 +1,218 @@
+"""Report dispatcher.
+
+Routes incoming report files to a worker pool per report family, classified by their header
+with probe_report. Pools are sized per family and started with warm workers,
+and every worker process only imports the schemas of its family.
+A huge card transaction file thereby only occupies the transactions pool,
+and small submissions of other families are not queued behind it.
+
+Example:
+    with ReportDispatcher({"transactions": 8, "payment_system_operators": 1}) as dispatcher:
+        futures = [dispatcher.submit(path) for path in paths]
+        for future in futures:
+            print(future.result().is_valid)
+        print(dispatcher.metrics())
+"""
+
+import multiprocessing
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Self
+
+from ..utils.family_schemas import FAMILY_SCHEMA_PATHS
+from .family_worker import (
+    DEFAULT_MAX_ERRORS,
+    FamilyReportResult,
+    validate_family_report,
+    warm_worker,
+    worker_pid,
+)
+from .report_probe import probe_report
+from .validation_timing import LatencyHistogram
+
+DEFAULT_POOL_SIZES: Mapping[str, int] = MappingProxyType(
+    {
+        "transactions": 4,
+        "aggregates": 1,
+        "direct_debits": 1,
+        "payment_system_operators": 1,
+        "quantity_items": 1,
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PoolMetrics:
+    """Metrics of the worker pool of a report family.
+
+    pending:    reports submitted and not finished, queued or being validated
+    queued:     pending reports waiting for a free worker
+    wait:       time from submission until a worker started on the report, in nanoseconds
+    latency:    time from submission until the report was validated, in nanoseconds
+    """
+
+    family: str
+    workers: int
+    submitted: int
+    completed: int
+    failed: int
+    pending: int
+    queued: int
+    wait: LatencyHistogram
+    latency: LatencyHistogram
+
+
+class _FamilyPool:
+    """Worker pool of a report family, with its counters."""
+
+    def __init__(self, family: str, workers: int) -> None:
+        self.family = family
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            # Spawned workers start without the schemas imported by the dispatcher.
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_worker,
+            initargs=(family,),
+        )
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait = LatencyHistogram()
+        self.latency = LatencyHistogram()
+
+    def done(self, future: Future[FamilyReportResult], submitted: int) -> None:
+        """Record a finished report, called when its future is done."""
+        finished = time.time_ns()
+        with self.lock:
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+                return
+            self.completed += 1
+            self.wait.record(future.result().started - submitted)
+            self.latency.record(finished - submitted)
+
+    def metrics(self) -> PoolMetrics:
+        with self.lock:
+            pending = self.submitted - self.completed - self.failed
+            wait = LatencyHistogram()
+            wait.merge(self.wait)
+            latency = LatencyHistogram()
+            latency.merge(self.latency)
+            return PoolMetrics(
+                family=self.family,
+                workers=self.workers,
+                submitted=self.submitted,
+                completed=self.completed,
+                failed=self.failed,
+                pending=pending,
+                queued=max(pending - self.workers, 0),
+                wait=wait,
+                latency=latency,
+            )
+
+
+class ReportDispatcher:
+    """Report dispatcher.
+
+    Validates report files in worker pools per report family.
+    Workers are spawned, so scripts using the dispatcher need a __main__ guard,
+    and modules imported by the main script are imported by the workers too.
+    """
+
+    def __init__(
+        self,
+        pool_sizes: Mapping[str, int] = DEFAULT_POOL_SIZES,
+        max_errors: int = DEFAULT_MAX_ERRORS,
+        warm: bool = True,
+    ) -> None:
+        """Set up a pool of pool_sizes[family] workers per report family.
+
+        Reports of families without a pool are rejected.
+        With warm, all workers are started and have imported their schemas before returning.
+        Every result holds the errors of at most max_errors invalid items.
+        """
+        for family, workers in pool_sizes.items():
+            if family not in FAMILY_SCHEMA_PATHS:
+                raise ValueError(
+                    f"Unknown report family. Got {family}, expected one of {list(FAMILY_SCHEMA_PATHS)}."
+                )
+            if workers < 1:
+                raise ValueError(
+                    f"Pool size has to be at least 1. Got {workers} for {family}."
+                )
+        self.max_errors = max_errors
+        self._pools = {
+            family: _FamilyPool(family, workers)
+            for family, workers in pool_sizes.items()
+        }
+        if warm:
+            self.warm()
+
+    def __enter__(self) -> Self:
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        """Wait for submitted reports and stop the workers."""
+        self.close()
+
+    def warm(self) -> None:
+        """Start the workers of all pools and wait until they have imported their schemas."""
+        futures = [
+            pool.executor.submit(worker_pid)
+            for pool in self._pools.values()
+            for _ in range(pool.workers)
+        ]
+        wait(futures)
+
+    def submit(
+        self, source: str | Path, family: str | None = None
+    ) -> Future[FamilyReportResult]:
+        """Validate a report file in the pool of its family, determined from the header when None.
+
+        Raises ValueError when the family can not be determined or has no pool.
+        """
+        if family is None:
+            family = probe_report(source).family
+        pool = self._pools.get(family)
+        if pool is None:
+            raise ValueError(
+                f"No worker pool for report family. Got {family}, expected one of {list(self._pools)}."
+            )
+        submitted = time.time_ns()
+        with pool.lock:
+            pool.submitted += 1
+        future = pool.executor.submit(
+            validate_family_report, str(source), family, self.max_errors
+        )
+        future.add_done_callback(lambda future: pool.done(future, submitted))
+        return future
+
+    def metrics(self) -> dict[str, PoolMetrics]:
+        """Metrics per report family."""
+        return {family: pool.metrics() for family, pool in self._pools.items()}
+
+    def summary(self) -> str:
+        """Summary of the pool metrics, latencies in milliseconds."""
+        lines = []
+        for metrics in self.metrics().values():
+            lines.append(
+                f"{metrics.family}: {metrics.workers} workers, {metrics.pending} pending, "
+                f"{metrics.queued} queued, {metrics.completed} completed, {metrics.failed} failed, "
+                f"wait p50 {metrics.wait.percentile(50) / 1e6:.1f}, "
+                f"latency p50 {metrics.latency.percentile(50) / 1e6:.1f}, "
+                f"p99 {metrics.latency.percentile(99) / 1e6:.1f} ms"
+            )
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        """Wait for submitted reports and stop the workers."""
+        for pool in self._pools.values():
+            pool.executor.shutdown()
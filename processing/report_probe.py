@@ -0,0 +1,95 @@
+"""Report probe.
+
+Reads and validates only the header of a report file, to route the file before validating it.
+Parsing stops at the items array when the header fields before it are complete,
+so probing takes the same time for any number of items.
+When required header fields are missing before the items array,
+the items are skipped without being decoded and the header fields after them are read.
+
+Example:
+    probe = probe_report(path)
+    pool = pools[probe.family, probe.reported_type]
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import ErrorDetails
+
+from ..utils.type_mapping import REPORT_VALIDATOR_MAPPING
+from ..utils.validation_clock import ValidationClock
+from ..utils.validation_context import ReportContext
+from .compact_rows import header_fields, row_encoded
+from .report_stream import ReportStream
+from .report_validator import REPORTED_TYPE_FIELDS, header_complete, report_family
+
+
+@dataclass(frozen=True, slots=True)
+class ReportProbe:
+    """Header of a report file."""
+
+    family: str
+    header: dict[str, Any]
+    report: BaseModel | None = None
+    header_errors: list[ErrorDetails] = field(default_factory=list)
+    bytes_read: int = 0
+
+    @property
+    def is_valid(self) -> bool:
+        """True when the header is valid."""
+        return self.report is not None
+
+    def _value(self, name: str) -> Any:
+        if self.report is not None:
+            return getattr(self.report, name)
+        return self.header.get(name)
+
+    @property
+    def reported_type(self) -> Any:
+        """Reported payment type, payment system metric or quantity item of the report."""
+        return self._value(REPORTED_TYPE_FIELDS[self.family])
+
+    @property
+    def reporter_id(self) -> str | None:
+        """Reporter id of the report."""
+        return self._value("reporter_id")
+
+    @property
+    def report_part(self) -> str | None:
+        """Report part of the report."""
+        return self._value("report_part")
+
+
+def probe_report(
+    source: str | Path | IO[Any],
+    family: str | None = None,
+    clock: ValidationClock | None = None,
+    complete: bool = False,
+) -> ReportProbe:
+    """Read and validate the header of a report, for a report family determined from the header when None.
+
+    With complete, the items are always skipped so that header fields after them are read too.
+    Raises ValueError when the report family can not be determined or the report is malformed.
+    """
+    if family is not None and family not in REPORT_VALIDATOR_MAPPING:
+        raise ValueError(
+            f"Unknown report family. Got {family}, expected one of {list(REPORT_VALIDATOR_MAPPING)}."
+        )
+    with ReportStream(source) as stream:
+        header = stream.read_header()
+        rows = row_encoded(stream)
+        if complete or not header_complete(header, family):
+            stream.skip_items()
+        header = dict(stream.header)
+        bytes_read = stream.bytes_read
+    family = family or report_family(header)
+    try:
+        report = REPORT_VALIDATOR_MAPPING[family].model_validate(
+            {**header_fields(header, rows), "items": []},
+            context=ReportContext(clock=clock or ValidationClock()),
+        )
+    except ValidationError as e:
+        return ReportProbe(family, header, None, e.errors(), bytes_read)
+    return ReportProbe(family, header, report, [], bytes_read)
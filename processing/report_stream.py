@@ -0,0 +1,333 @@
+"""Streaming report reader.
+
+Reads a report file (a JSON object with the report header fields and an items array)
+incrementally, so that items can be processed one at a time without loading the whole file into memory.
+"""
+
+import codecs
+import io
+import json
+import re
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import IO, Any, Self
+
+from .compressed_input import open_input
+
+CHUNK_SIZE = 1 << 16
+# Longest JSON value read, in characters, an item or a header field.
+MAX_VALUE_SIZE = 1 << 22
+_WHITESPACE = " \t\n\r"
+# Run of characters up to the next bracket or brace outside strings.
+_SKIP = re.compile(r'(?:[^"\[\]{}]++|"(?:[^"\\]++|\\.)*+")*+', re.DOTALL)
+_NON_STRUCTURE = re.compile(r"[^\[\]{}]++")
+
+
+class ReportStream:
+    """Report stream.
+
+    Header fields before the items array are available in header after read_header.
+    Header fields after the items array are added to header when items has been exhausted
+    or skipped.
+    """
+
+    def __init__(
+        self,
+        source: str | Path | IO[Any],
+        chunk_size: int = CHUNK_SIZE,
+        workers: int = 1,
+        parse_float: Callable[[str], Any] | None = None,
+    ):
+        """Open report from a path or a text or binary file object.
+
+        Gzip and zstd compressed reports are decompressed while they are read,
+        by workers threads for files of several members or frames, see open_input.
+        JSON numbers with a fraction or exponent are decoded by parse_float, float when None.
+        """
+        if isinstance(source, str | Path):
+            source = open_input(source, workers)
+            self._owns_file = True
+        else:
+            if not isinstance(source, io.TextIOBase):
+                source = open_input(source)
+            self._owns_file = False
+        self._fp = source
+        self._binary = not isinstance(source, io.TextIOBase)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder(parse_float=parse_float)
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._started = False
+        self._items_pending = False
+        self._items_done = False
+        self._resumed = False
+        self.header: dict[str, Any] = {}
+        self.bytes_read = 0
+
+    def __enter__(self) -> Self:
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        """Close file if opened by the stream."""
+        self.close()
+
+    def close(self) -> None:
+        """Close file if opened by the stream."""
+        if self._owns_file:
+            self._fp.close()
+
+    def read_header(self) -> dict[str, Any]:
+        """Parse header fields up to the items array or the end of the report."""
+        if not self._started:
+            self._expect("{")
+            self._started = True
+            self._items_pending = self._read_members()
+        return self.header
+
+    def items(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the items one at a time."""
+        self.read_header()
+        if not self._items_pending:
+            return
+        self._items_pending = False
+        if self._resumed:
+            more = self._expect(",]") == ","
+        else:
+            self._expect("[")
+            more = self._peek() != "]"
+            if not more:
+                self._pos += 1
+        while more:
+            yield self._decode()
+            more = self._expect(",]") == ","
+        self._items_done = True
+        self._read_members(after_items=True)
+
+    def peek_item(self) -> str:
+        """First character of the first item, "]" for an empty items array.
+
+        Returns "" when there is no items array, or the items have already been started.
+        Nothing is consumed, so the items can be read afterwards.
+        """
+        self.read_header()
+        if not self._items_pending or self._resumed or self._peek() != "[":
+            return ""
+        pos = self._pos + 1
+        while True:
+            while pos < len(self._buf) and self._buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(self._buf):
+                return self._buf[pos]
+            pos -= self._pos
+            if not self._fill():
+                return ""
+
+    @property
+    def offset(self) -> int:
+        """Offset of the next unparsed character of the report, in bytes for binary sources.
+
+        After an item has been returned by items, this is the offset right after the item.
+        """
+        if not self._binary:
+            return self.bytes_read - (len(self._buf) - self._pos)
+        pending = self._text_decoder.getstate()[0]
+        return (
+            self.bytes_read - len(pending) - len(self._buf[self._pos :].encode("utf-8"))
+        )
+
+    def resume_items(self, offset: int) -> None:
+        """Continue the items array after the item ending at offset, an offset read after an item.
+
+        The header is read first. Sources that are not seekable are read up to offset.
+        Raises ValueError for text sources, which have no byte offsets.
+        """
+        if not self._binary:
+            raise ValueError("Items can only be resumed in binary sources.")
+        self.read_header()
+        if not self._items_pending:
+            raise ValueError("Malformed report. Expected an items array to resume.")
+        current = self.offset
+        if offset < current:
+            raise ValueError(
+                f"Resume offset is before the items array. Got {offset}, items start at {current}."
+            )
+        buffered = self._buf[self._pos :].encode("utf-8")
+        if offset - current <= len(buffered):
+            # The offset is in the buffer, at a character boundary after an item.
+            self._pos += len(buffered[: offset - current].decode("utf-8"))
+        else:
+            self._buf = ""
+            self._pos = 0
+            self._text_decoder.reset()
+            if self._fp.seekable():
+                self._fp.seek(offset)
+            else:
+                skip = offset - self.bytes_read
+                while skip > 0:
+                    data = self._fp.read(min(skip, self._chunk_size))
+                    if not data:
+                        raise ValueError("Unexpected end of report.")
+                    skip -= len(data)
+            self.bytes_read = offset
+        self._resumed = True
+
+    def skip_items(self) -> None:
+        """Skip the items array without decoding the items, then parse the header fields after it."""
+        self.read_header()
+        if not self._items_pending:
+            return
+        self._items_pending = False
+        self._expect("[")
+        depth = 1
+        while depth:
+            depth = self._skip_buffer(depth)
+            if depth and not self._fill():
+                raise ValueError("Unexpected end of report.")
+        self._items_done = True
+        self._read_members(after_items=True)
+
+    def _skip_buffer(self, depth: int) -> int:
+        """Skip the buffer until the array at depth is closed, returns the depth reached.
+
+        Stops at the end of the buffer, or at a string continuing in the next chunk.
+        """
+        region = self._buf[self._pos :]
+        if "\\" not in region:
+            # Without escapes, strings are the odd parts between quotes.
+            parts = region.split('"')
+            if not len(parts) % 2:
+                # A string continues in the next chunk, skip up to its opening quote.
+                region = region[: len(region) - len(parts.pop()) - 1]
+            structure = _NON_STRUCTURE.sub("", "".join(parts[::2]))
+            end_depth = depth
+            for char in structure:
+                end_depth += 1 if char in "[{" else -1
+                if not end_depth:
+                    break
+            if end_depth:
+                self._pos += len(region)
+                return end_depth
+        # The array closes in the buffer or there are escapes, scan it string by string.
+        while depth:
+            pos = _SKIP.match(self._buf, self._pos).end()  # type: ignore[union-attr]
+            if pos == len(self._buf) or self._buf[pos] == '"':
+                self._pos = pos
+                return depth
+            depth += 1 if self._buf[pos] in "[{" else -1
+            self._pos = pos + 1
+        return depth
+
+    def _read_members(self, after_items: bool = False) -> bool:
+        """Parse object members until the items key, returns True when stopped at items."""
+        if after_items:
+            if self._expect(",}") == "}":
+                return False
+        elif self._peek() == "}":
+            self._pos += 1
+            return False
+
+        while True:
+            key = self._decode()
+            self._expect(":")
+            if key == "items" and not self._items_done:
+                return True
+            self.header[key] = self._decode()
+            if self._expect(",}") == "}":
+                return False
+
+    def _fill(self) -> bool:
+        """Read next chunk into buffer, returns False at end of file."""
+        if self._eof:
+            return False
+        data = self._fp.read(self._chunk_size)
+        self.bytes_read += len(data)
+        chunk = (
+            self._text_decoder.decode(data, final=not data) if self._binary else data
+        )
+        if not data:
+            self._eof = True
+            return False
+        if self._pos:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        self._buf += chunk
+        return True
+
+    def _peek(self) -> str:
+        """Next non whitespace character."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of report.")
+
+    def _expect(self, chars: str) -> str:
+        """Consume next non whitespace character, which has to be one of chars."""
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(
+                f"Malformed report. Expected one of {chars!r} at position {self._pos}, got {char!r}."
+            )
+        self._pos += 1
+        return char
+
+    def _decode(self) -> Any:
+        """Decode next JSON value, reading more chunks while the value is incomplete.
+
+        A malformed object or array fails as soon as it is closed in the buffer,
+        and any value longer than MAX_VALUE_SIZE characters raises ValueError,
+        so that a malformed value does not read the rest of the report into memory.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._value_complete():
+                    raise
+                size = len(self._buf) - self._pos
+                if size >= MAX_VALUE_SIZE:
+                    raise ValueError(
+                        f"Malformed report. Expected a JSON value of at most {MAX_VALUE_SIZE} characters "
+                        f"at offset {self.offset}. Got {e.msg}."
+                    ) from e
+                # Read at least as much again before decoding again,
+                # so that decoding a long value takes linear time.
+                target = min(2 * size, MAX_VALUE_SIZE)
+                while len(self._buf) - self._pos < target and self._fill():
+                    pass
+                if len(self._buf) - self._pos > size:
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _value_complete(self) -> bool:
+        """True when the object or array at the current position is closed in the buffer."""
+        if self._buf[self._pos] not in "[{":
+            return False
+        depth = 0
+        pos = self._pos
+        while True:
+            pos = _SKIP.match(self._buf, pos).end()  # type: ignore[union-attr]
+            if pos == len(self._buf) or self._buf[pos] == '"':
+                # The end of the buffer, or a string continuing in the next chunk.
+                return False
+            depth += 1 if self._buf[pos] in "[{" else -1
+            pos += 1
+            if not depth:
+                return True
+
+
+def read_report_header(source: str | Path | IO[Any]) -> dict[str, Any]:
+    """Header fields before the items array of a report."""
+    with ReportStream(source) as stream:
+        return stream.read_header()
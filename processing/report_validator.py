@@ -0,0 +1,529 @@
+"""Streaming report validator.
+
+Validates a report file item by item without materializing the items list.
+The report header is validated first against the report schema in REPORT_VALIDATOR_MAPPING,
+then every item is validated against the item schema in VALIDATOR_MAPPING,
+with the header values shared through the validation context.
+
+Validated items can be passed on to optional pipeline stages, for example a partitioner.
+"""
+
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, Protocol
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import ErrorDetails
+
+from ..enums.aggregates_enums import PaymentTypeAggregates
+from ..enums.direct_debits_enums import PaymentTypeDirectDebits
+from ..enums.transaction_enums import PaymentTypeTransactions
+from ..utils.family_schemas import FAMILY_SCHEMA_PATHS
+from ..utils.item_fields import BATCH_SIZE
+from ..utils.key_validation import KeySchema, key_schema
+from ..utils.type_mapping import REPORT_VALIDATOR_MAPPING, VALIDATOR_MAPPING
+from ..utils.validation_clock import ValidationClock
+from ..utils.validation_context import ReportContext
+from .compact_rows import header_fields, report_items, row_encoded
+from .item_errors import ErrorStore, ItemError
+from .item_results import check_item
+from .memory_accounting import (
+    NO_LIMITS,
+    MemoryLimitError,
+    MemoryLimits,
+    ValidationStats,
+)
+from .report_stream import ReportStream
+from .validation_checkpoint import DEFAULT_CHECKPOINT_ITEMS, ValidationCheckpoint
+from .validation_timing import ValidationTimer
+
+# Header field holding the reported type of each report family.
+REPORTED_TYPE_FIELDS: dict[str, str] = {
+    family: paths.reported_type_field for family, paths in FAMILY_SCHEMA_PATHS.items()
+}
+
+
+class ItemStage(Protocol):
+    """Pipeline stage receiving validated items.
+
+    Stages with a start_report(report) method are given the validated report header
+    before its items.
+    """
+
+    def add(self, item: BaseModel) -> None:
+        """Receive a validated item."""
+
+    def close(self) -> None:
+        """Called when all items have been validated."""
+
+
+@dataclass
+class ValidationResult:
+    """Result of a report validation."""
+
+    family: str | None = None
+    report: BaseModel | None = None
+    header_errors: list[ErrorDetails] = field(default_factory=list)
+    item_errors: ErrorStore = field(default_factory=ErrorStore)
+    items: int = 0
+    valid_items: int = 0
+    timer: ValidationTimer | None = None
+    bytes_parsed: int = 0
+    live_items: int = 0
+    peak_live_items: int = 0
+
+    @property
+    def is_valid(self) -> bool:
+        """True when header and all items are valid."""
+        return not self.header_errors and not self.item_errors
+
+    def stats(self) -> ValidationStats:
+        """Memory statistics of the validation run."""
+        return ValidationStats(
+            bytes_parsed=self.bytes_parsed,
+            items=self.items,
+            live_items=self.live_items,
+            peak_live_items=self.peak_live_items,
+            errors=len(self.item_errors),
+            error_bytes=self.item_errors.bytes,
+            spilled_errors=self.item_errors.spilled,
+        )
+
+
+def report_family(header: dict[str, Any]) -> str:
+    """Report family in REPORT_VALIDATOR_MAPPING from the header fields."""
+    if "reported_payment_system_metric" in header:
+        return "payment_system_operators"
+    if "reported_quantity_item" in header:
+        return "quantity_items"
+    reported_payment_type = header.get("reported_payment_type")
+    for family, payment_types in (
+        ("transactions", PaymentTypeTransactions),
+        ("aggregates", PaymentTypeAggregates),
+        ("direct_debits", PaymentTypeDirectDebits),
+    ):
+        if reported_payment_type in {t.value for t in payment_types}:
+            return family
+    raise ValueError(
+        f"Report family can not be determined from header. Got reported_payment_type {reported_payment_type}."
+    )
+
+
+def _required_fields(family: str) -> set[str]:
+    schema = REPORT_VALIDATOR_MAPPING[family]
+    return {
+        name
+        for name, field_info in schema.model_fields.items()
+        if field_info.is_required() and name != "items"
+    }
+
+
+def header_complete(header: dict[str, Any], family: str | None) -> bool:
+    """True when the header has all required fields of its report schema."""
+    if family is None:
+        try:
+            family = report_family(header)
+        except ValueError:
+            return False
+    return _required_fields(family) <= header.keys()
+
+
+def family_error(header: dict[str, Any], error: ValueError) -> list[ErrorDetails]:
+    """Header error of a report family that can not be determined from the header."""
+    return ValidationError.from_exception_data(
+        "Report",
+        [
+            {
+                "type": "value_error",
+                "loc": ("reported_payment_type",),
+                "input": header.get("reported_payment_type"),
+                "ctx": {"error": str(error)},
+            }
+        ],
+    ).errors()
+
+
+def complete_header(
+    source: str | Path | IO[Any], position: int | None = None
+) -> dict[str, Any]:
+    """Header fields before and after the items array, read with a stream of their own.
+
+    A file object is read from position and then moved back to where it was.
+    """
+    if isinstance(source, str | Path):
+        with ReportStream(source) as stream:
+            stream.skip_items()
+            return dict(stream.header)
+    current = source.tell()
+    source.seek(position or 0)
+    try:
+        with ReportStream(source) as stream:
+            stream.skip_items()
+            return dict(stream.header)
+    finally:
+        source.seek(current)
+
+
+def item_schema(family: str, report: BaseModel) -> type[BaseModel]:
+    """Item schema for a validated report."""
+    return VALIDATOR_MAPPING[getattr(report, REPORTED_TYPE_FIELDS[family])]
+
+
+def free_threading_enabled() -> bool:
+    """True on a free-threaded CPython build running without the GIL."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def default_threads() -> int:
+    """Number of validation threads, one per CPU without the GIL and a single thread with it."""
+    return (os.cpu_count() or 1) if free_threading_enabled() else 1
+
+
+def validate_item(
+    schema: type[BaseModel],
+    keys: KeySchema | None,
+    context: ReportContext,
+    index: int,
+    item: dict[str, Any],
+) -> BaseModel | ItemError:
+    """Validated item, or the errors of the item."""
+    if keys is not None and isinstance(item, dict) and not keys.is_valid(item):
+        return ItemError(index, keys.errors(item))
+    result = check_item(schema, item, context)
+    if result.model is not None:
+        return result.model
+    return ItemError(index, result.error_details())
+
+
+def validate_batch(
+    schema: type[BaseModel],
+    keys: KeySchema | None,
+    context: ReportContext,
+    start: int,
+    batch: list[dict[str, Any]],
+    latencies: array | None = None,
+) -> tuple[list[BaseModel], list[ItemError]]:
+    """Validate a batch of items starting at index start.
+
+    Valid items and errors are collected in lists owned by the calling thread,
+    so batches can be validated concurrently without shared mutable state.
+    The validation time of each item in nanoseconds is appended to latencies, when given.
+    """
+    valid: list[BaseModel] = []
+    errors: list[ItemError] = []
+    for index, item in enumerate(batch, start):
+        if latencies is None:
+            validated = validate_item(schema, keys, context, index, item)
+        else:
+            started = time.perf_counter_ns()
+            validated = validate_item(schema, keys, context, index, item)
+            latencies.append(time.perf_counter_ns() - started)
+        if isinstance(validated, ItemError):
+            errors.append(validated)
+        else:
+            valid.append(validated)
+    return valid, errors
+
+
+def _batched(
+    items: Iterable[dict[str, Any]], size: int, start: int = 0
+) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+    """Batches of items with the index of their first item, starting at start."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield start, batch
+        start += len(batch)
+
+
+def _limited_items(stream: ReportStream, max_bytes: int) -> Iterator[dict[str, Any]]:
+    """Items of stream, aborting when more than max_bytes have been parsed."""
+    for item in report_items(stream):
+        if stream.bytes_read > max_bytes:
+            raise MemoryLimitError(
+                f"Report exceeds the input limit. Got more than {max_bytes} bytes."
+            )
+        yield item
+
+
+class ReportValidator:
+    """Report validator.
+
+    Validates a report header and streams its items through the item schema.
+    """
+
+    def __init__(
+        self,
+        family: str | None = None,
+        stages: Sequence[ItemStage] = (),
+        clock: ValidationClock | None = None,
+        check_keys: bool = False,
+        threads: int | None = None,
+        timer: ValidationTimer | None = None,
+        limits: MemoryLimits = NO_LIMITS,
+    ) -> None:
+        """Set up validator for a report family, determined from the header when None.
+
+        Timestamps are checked against clock, a new clock at the start of each validation run when None.
+        With check_keys, items with missing or extra keys are rejected with only their key errors,
+        before any typed validation.
+        Items are validated in batches by threads,
+        by default one thread per CPU on free-threaded builds and a single thread otherwise.
+        With a timer, the validation time of every item is recorded per schema.
+        limits bound the memory held by each validation run.
+        """
+        if family is not None and family not in REPORT_VALIDATOR_MAPPING:
+            raise ValueError(
+                f"Unknown report family. Got {family}, expected one of {list(REPORT_VALIDATOR_MAPPING)}."
+            )
+        self.family = family
+        self.stages = stages
+        self.clock = clock
+        self.check_keys = check_keys
+        self.threads = default_threads() if threads is None else threads
+        self.timer = timer
+        self.limits = limits
+
+    def validate_header(
+        self,
+        header: dict[str, Any],
+        result: ValidationResult,
+        clock: ValidationClock,
+        rows: bool = True,
+    ) -> BaseModel | None:
+        """Validate header fields against the report schema.
+
+        With rows False, the items are objects and a columns field is validated as a header field.
+        A report family that can not be determined is reported as a header error.
+        """
+        try:
+            result.family = self.family or report_family(header)
+        except ValueError as e:
+            result.header_errors = family_error(header, e)
+            return None
+        try:
+            result.report = REPORT_VALIDATOR_MAPPING[result.family].model_validate(
+                {**header_fields(header, rows), "items": []},
+                context=ReportContext(clock=clock),
+            )
+        except ValidationError as e:
+            result.header_errors = e.errors()
+        return result.report
+
+    def validate_items(
+        self,
+        items: Iterable[dict[str, Any]],
+        schema: type[BaseModel],
+        context: ReportContext,
+        result: ValidationResult,
+        start: int = 0,
+        checkpoint: ValidationCheckpoint | None = None,
+    ) -> None:
+        """Validate items against schema and pass valid items to the stages.
+
+        Items are numbered from start, the items done when resuming from checkpoint.
+        """
+        keys = key_schema(schema) if self.check_keys else None
+        if self.threads > 1:
+            self._validate_items_threaded(
+                items, schema, keys, context, result, start, checkpoint
+            )
+            return
+        timer = self.timer
+        result.live_items = result.peak_live_items = 1
+        for index, item in enumerate(items, start):
+            result.items += 1
+            if timer is None:
+                validated = validate_item(schema, keys, context, index, item)
+            else:
+                started = time.perf_counter_ns()
+                validated = validate_item(schema, keys, context, index, item)
+                timer.record(schema, index, item, time.perf_counter_ns() - started)
+            if isinstance(validated, ItemError):
+                result.item_errors.append(validated)
+            else:
+                self._collect([validated], result)
+            if checkpoint is not None:
+                checkpoint.done(index + 1, result, context.clock)
+        result.live_items = 0
+
+    def _batching(self) -> tuple[int, int]:
+        """Batch size and most batches in flight of threaded validation."""
+        batch_size = BATCH_SIZE
+        in_flight = 2 * self.threads
+        if self.limits.max_live_items is not None:
+            batch_size = max(min(batch_size, self.limits.max_live_items), 1)
+            in_flight = max(min(in_flight, self.limits.max_live_items // batch_size), 1)
+        return batch_size, in_flight
+
+    def _validate_items_threaded(
+        self,
+        items: Iterable[dict[str, Any]],
+        schema: type[BaseModel],
+        keys: KeySchema | None,
+        context: ReportContext,
+        result: ValidationResult,
+        first: int = 0,
+        checkpoint: ValidationCheckpoint | None = None,
+    ) -> None:
+        """Validate batches of items in a thread pool, keeping at most two batches per thread in flight.
+
+        With max_live_items, batches and batches in flight are reduced to stay within the limit.
+        Results are collected in submission order, so stages receive items in report order.
+        """
+        batch_size, in_flight = self._batching()
+        pending: deque = deque()
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            for start, batch in _batched(items, batch_size, first):
+                result.items += len(batch)
+                latencies = None if self.timer is None else array("q")
+                future = executor.submit(
+                    validate_batch, schema, keys, context, start, batch, latencies
+                )
+                pending.append(
+                    (future, schema, start, batch, latencies, context, checkpoint)
+                )
+                result.live_items += len(batch)
+                result.peak_live_items = max(result.peak_live_items, result.live_items)
+                if len(pending) >= in_flight:
+                    self._collect_batch(*pending.popleft(), result)
+            while pending:
+                self._collect_batch(*pending.popleft(), result)
+
+    def _collect_batch(
+        self,
+        future: Future[tuple[list[BaseModel], list[ItemError]]],
+        schema: type[BaseModel],
+        start: int,
+        batch: list[dict[str, Any]],
+        latencies: array | None,
+        context: ReportContext,
+        checkpoint: ValidationCheckpoint | None,
+        result: ValidationResult,
+    ) -> None:
+        valid, errors = future.result()
+        result.live_items -= len(batch)
+        if self.timer is not None and latencies is not None:
+            self.timer.record_batch(schema, start, batch, latencies)
+        result.item_errors.extend(errors)
+        self._collect(valid, result)
+        if checkpoint is not None:
+            checkpoint.done(start + len(batch), result, context.clock)
+
+    def _collect(self, valid: list[BaseModel], result: ValidationResult) -> None:
+        """Pass valid items to the stages."""
+        result.valid_items += len(valid)
+        for model in valid:
+            for stage in self.stages:
+                stage.add(model)
+
+    def _checkpointer(
+        self,
+        source: str | Path,
+        checkpoint: str | Path,
+        checkpoint_items: int,
+    ) -> ValidationCheckpoint:
+        """Checkpoint of the validation of source, saved every checkpoint_items items."""
+        if self.threads > 1:
+            batch_size = self._batching()[0]
+            checkpoint_items = -(-checkpoint_items // batch_size) * batch_size
+        return ValidationCheckpoint(checkpoint, source, self.stages, checkpoint_items)
+
+    def _start_report(self, report: BaseModel) -> None:
+        """Pass the validated report header to the stages with a start_report method."""
+        for stage in self.stages:
+            start_report = getattr(stage, "start_report", None)
+            if start_report is not None:
+                start_report(report)
+
+    def _read_header(
+        self,
+        stream: ReportStream,
+        source: str | Path | IO[Any],
+        position: int | None,
+    ) -> dict[str, Any]:
+        """Header of the report, completed by header fields after the items.
+
+        The fields after the items are read by a second pass over source,
+        for paths and for file objects that were seekable at position.
+        """
+        header = stream.read_header()
+        if not header_complete(header, self.family) and (
+            isinstance(source, str | Path) or position is not None
+        ):
+            header = complete_header(source, position)
+        return header
+
+    def validate(
+        self,
+        source: str | Path | IO[Any],
+        checkpoint: str | Path | None = None,
+        checkpoint_items: int = DEFAULT_CHECKPOINT_ITEMS,
+    ) -> ValidationResult:
+        """Validate a report file.
+
+        Header fields after the items array are read by skipping the items first,
+        for paths and seekable file objects.
+        With checkpoint, the progress is saved to the checkpoint file every checkpoint_items items
+        (rounded up to whole batches with threads), and a validation of the same report file
+        resumes from the checkpoint. The checkpoint is removed when the validation has finished.
+        All stages have to be checkpointable, see ValidationCheckpoint.
+        Raises MemoryLimitError when the run exceeds a limit that does not spill.
+        """
+        limits = self.limits
+        result = ValidationResult(
+            item_errors=ErrorStore(
+                limits.max_error_bytes, limits.spill_errors, limits.spill_dir
+            )
+        )
+        clock = self.clock or ValidationClock()
+        checkpointer = None
+        if checkpoint is not None:
+            if not isinstance(source, str | Path):
+                raise ValueError("Checkpoints require a report path.")
+            checkpointer = self._checkpointer(source, checkpoint, checkpoint_items)
+            clock = checkpointer.clock() or clock
+        position = None
+        if not isinstance(source, str | Path) and source.seekable():
+            position = source.tell()
+        with ReportStream(source) as stream:
+            header = self._read_header(stream, source, position)
+            rows = row_encoded(stream)
+            report = self.validate_header(header, result, clock, rows)
+            result.bytes_parsed = stream.bytes_read
+            if report is None:
+                return result
+            self._start_report(report)
+            start = 0
+            if checkpointer is not None:
+                start = checkpointer.restore(stream, result)
+            items = (
+                report_items(stream)
+                if limits.max_input_bytes is None
+                else _limited_items(stream, limits.max_input_bytes)
+            )
+            if checkpointer is not None:
+                items = checkpointer.track(stream, items, start)
+            self.validate_items(
+                items,
+                item_schema(result.family, report),  # type: ignore[arg-type]
+                ReportContext.from_report(report, clock),
+                result,
+                start,
+                checkpointer,
+            )
+            result.bytes_parsed = stream.bytes_read
+        for stage in self.stages:
+            stage.close()
+        if checkpointer is not None:
+            checkpointer.remove()
+        result.timer = self.timer
+        return result
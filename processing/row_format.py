@@ -0,0 +1,458 @@
+"""Binary row format for validated items.
+
+A compact, versioned intermediate format between validation and aggregation,
+with one fixed-width row per item:
+    enums       code of the member, 1-based, 0 for None
+    strings     1-based index into the string dictionary of the file, 0 for None
+    decimals    int64 minor units (value * 10**decimal_places)
+    dates       int32 days since 1970-01-01
+    timestamps  int64 seconds since 1970-01-01T00:00:00 local time
+    integers    int64
+    floats      float64, NaN for None
+
+File layout, in native byte order:
+    header      magic b"PSRF", format version, length of the layout, JSON layout, padding to 8 bytes
+    rows        fixed-width rows
+    dictionary  padding to 8 bytes, number of strings + 1 offsets, then the UTF-8 strings
+    footer      rows offset, number of rows, dictionary offset, number of strings, magic
+
+The layout in the header describes the fields and the enum members,
+so files can be read without the schema and stay readable when enums change.
+The footer is written last, so rows can be streamed to non-seekable outputs.
+Files are read through a memory map and can be sliced, or viewed as a NumPy structured array.
+
+Example:
+    with RowWriter("credit_transfers.rows", CreditTransfer) as writer:
+        for item in items:
+            writer.write(item)
+
+    with RowReader("credit_transfers.rows") as reader:
+        transactions = reader.to_numpy()
+"""
+
+import json
+import math
+import mmap
+import struct
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from types import NoneType, UnionType
+from typing import IO, Annotated, Any, Self, Union, get_args, get_origin, overload
+
+from pydantic import BaseModel, FutureDate, PastDate
+
+from ..utils.date_parsing import (
+    EPOCH_ORDINAL,
+    INVALID_DAY,
+    INVALID_TIMESTAMP,
+    to_day_number,
+    to_epoch_seconds,
+)
+
+MAGIC = b"PSRF"
+FORMAT_VERSION = 1
+DEFAULT_DECIMAL_PLACES = 2
+
+NULL_INT64 = -(2**63)
+"""Value of None in integer and decimal columns."""
+
+MAX_INT64 = 2**63 - 1
+
+_HEADER = struct.Struct("=4sII")
+_FOOTER = struct.Struct("=QQQQ4s")
+_EPOCH = datetime(1970, 1, 1)
+
+# NumPy type of each struct format.
+_NUMPY_TYPES: dict[str, str] = {
+    "B": "u1",
+    "H": "u2",
+    "I": "u4",
+    "i": "i4",
+    "q": "i8",
+    "d": "f8",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class RowField:
+    """Field of a row."""
+
+    name: str
+    kind: str
+    format: str
+    decimal_places: int = 0
+    members: tuple[str | int, ...] = ()
+
+
+def _field_type(annotation: Any) -> Any:
+    """Underlying type of a field annotation, without Optional, Annotated and NewType."""
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _field_type(get_args(annotation)[0])
+    if origin is Union or origin is UnionType:
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(args) == 1:
+            return _field_type(args[0])
+    supertype = getattr(annotation, "__supertype__", None)
+    if supertype is not None:
+        return _field_type(supertype)
+    if annotation in (PastDate, FutureDate):
+        return date
+    return annotation
+
+
+def _decimal_places(metadata: list[Any]) -> int:
+    for constraint in metadata:
+        decimal_places = getattr(constraint, "decimal_places", None)
+        if decimal_places is not None:
+            return decimal_places
+    return DEFAULT_DECIMAL_PLACES
+
+
+def schema_fields(schema: type[BaseModel]) -> tuple[RowField, ...]:
+    """Row fields of a schema."""
+    fields = []
+    for name, info in schema.model_fields.items():
+        field_type = _field_type(info.annotation)
+        if isinstance(field_type, type) and issubclass(field_type, Enum):
+            members = tuple(member.value for member in field_type)
+            fields.append(
+                RowField(
+                    name, "enum", "B" if len(members) < 255 else "H", members=members
+                )
+            )
+        elif field_type is Decimal:
+            fields.append(
+                RowField(name, "decimal", "q", _decimal_places(info.metadata))
+            )
+        elif field_type is datetime:
+            fields.append(RowField(name, "timestamp", "q"))
+        elif field_type is date:
+            fields.append(RowField(name, "date", "i"))
+        elif field_type is int:
+            fields.append(RowField(name, "integer", "q"))
+        elif field_type is float:
+            fields.append(RowField(name, "float", "d"))
+        elif field_type is str:
+            fields.append(RowField(name, "string", "I"))
+        else:
+            raise ValueError(
+                f"Unsupported field type in binary row format. Got {info.annotation} for {schema.__name__}.{name}."
+            )
+    return tuple(fields)
+
+
+def _encoder(field: RowField, strings: dict[str, int]) -> Callable[[Any], int | float]:
+    """Function from a model value to the row value of field."""
+    match field.kind:
+        case "enum":
+            return _enum_encoder(field)
+        case "string":
+            return _string_encoder(strings)
+        case "decimal":
+            return _decimal_encoder(field)
+        case "date":
+            return lambda v: INVALID_DAY if v is None else to_day_number(v)
+        case "timestamp":
+            return lambda v: INVALID_TIMESTAMP if v is None else to_epoch_seconds(v)
+        case "integer":
+            return lambda v: NULL_INT64 if v is None else _int64(v, field)
+        case "float":
+            return lambda v: math.nan if v is None else v
+    raise ValueError(f"Unknown field kind. Got {field.kind}.")
+
+
+def _enum_encoder(field: RowField) -> Callable[[Enum | str | int | None], int]:
+    """Function from an enum member or value to its code, 0 for None."""
+    codes = {value: code for code, value in enumerate(field.members, 1)}
+
+    def encode_enum(v: Enum | str | int | None) -> int:
+        if v is None:
+            return 0
+        return codes[v.value if isinstance(v, Enum) else v]
+
+    return encode_enum
+
+
+def _string_encoder(strings: dict[str, int]) -> Callable[[str | None], int]:
+    """Function from a string to its index in strings, 0 for None.
+
+    New strings are added to strings.
+    """
+
+    def encode_string(v: str | None) -> int:
+        if v is None:
+            return 0
+        index = strings.get(v)
+        if index is None:
+            index = strings[v] = len(strings) + 1
+        return index
+
+    return encode_string
+
+
+def _decimal_encoder(field: RowField) -> Callable[[Decimal | None], int]:
+    """Function from a decimal to its value in minor units, NULL_INT64 for None."""
+    scale = Decimal(1).scaleb(-field.decimal_places)
+
+    def encode_decimal(v: Decimal | None) -> int:
+        if v is None:
+            return NULL_INT64
+        minor = v / scale
+        if minor != minor.to_integral_value():
+            raise ValueError(
+                f"Value has more than {field.decimal_places} decimal places. Got {v} for {field.name}."
+            )
+        return _int64(int(minor), field)
+
+    return encode_decimal
+
+
+def _int64(v: int, field: RowField) -> int:
+    """v when it fits an int64 column, NULL_INT64 is reserved for None."""
+    if not NULL_INT64 < v <= MAX_INT64:
+        raise ValueError(
+            f"Value is outside the int64 range of the binary row format. Got {v} for {field.name}."
+        )
+    return v
+
+
+def _decoder(field: RowField, strings: Callable[[int], str]) -> Callable[[Any], Any]:
+    """Function from a row value of field to a plain value."""
+    match field.kind:
+        case "enum":
+            members = (None, *field.members)
+            return members.__getitem__
+        case "string":
+            return lambda v: None if v == 0 else strings(v - 1)
+        case "decimal":
+            places = field.decimal_places
+            return lambda v: None if v == NULL_INT64 else Decimal(v).scaleb(-places)
+        case "date":
+            return lambda v: (
+                None if v == INVALID_DAY else date.fromordinal(v + EPOCH_ORDINAL)
+            )
+        case "timestamp":
+            return lambda v: (
+                None if v == INVALID_TIMESTAMP else _EPOCH + timedelta(seconds=v)
+            )
+        case "integer":
+            return lambda v: None if v == NULL_INT64 else v
+        case "float":
+            return lambda v: None if math.isnan(v) else v
+    raise ValueError(f"Unknown field kind. Got {field.kind}.")
+
+
+def _row_struct(fields: Iterable[RowField]) -> struct.Struct:
+    return struct.Struct("=" + "".join(field.format for field in fields))
+
+
+class RowWriter:
+    """Streaming writer of validated items in the binary row format."""
+
+    def __init__(self, target: str | Path | IO[bytes], schema: type[BaseModel]) -> None:
+        """Write the header of a row file for schema to target, a path or a binary file object."""
+        self._owns_file = isinstance(target, (str, Path))
+        self._file: IO[bytes] = open(target, "wb") if self._owns_file else target  # type: ignore[assignment]  # noqa: SIM115
+        self.schema = schema
+        self.fields = schema_fields(schema)
+        self._struct = _row_struct(self.fields)
+        self._strings: dict[str, int] = {}
+        self._encoders = [_encoder(field, self._strings) for field in self.fields]
+        self._names = [field.name for field in self.fields]
+        self.rows = 0
+        self._closed = False
+
+        layout = json.dumps(
+            {
+                "schema": schema.__name__,
+                "fields": [asdict(field) for field in self.fields],
+            }
+        ).encode()
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(layout)) + layout
+        header += b"\0" * (-len(header) % 8)
+        self._file.write(header)
+        self.rows_offset = self._position = len(header)
+
+    def write(self, item: BaseModel) -> None:
+        """Write item as a row."""
+        values = item.__dict__
+        row = self._struct.pack(
+            *[
+                encode(values[name])
+                for encode, name in zip(self._encoders, self._names, strict=True)
+            ]
+        )
+        self._file.write(row)
+        self._position += len(row)
+        self.rows += 1
+
+    def write_many(self, items: Iterable[BaseModel]) -> None:
+        """Write items as rows."""
+        for item in items:
+            self.write(item)
+
+    def close(self) -> None:
+        """Write the string dictionary and the footer."""
+        if self._closed:
+            return
+        self._closed = True
+        encoded = [string.encode() for string in self._strings]
+        offsets = array("Q", [0])
+        for string in encoded:
+            offsets.append(offsets[-1] + len(string))
+        padding = b"\0" * (-self._position % 8)
+        self._file.write(padding)
+        dictionary_offset = self._position + len(padding)
+        self._file.write(offsets.tobytes())
+        self._file.write(b"".join(encoded))
+        self._file.write(
+            _FOOTER.pack(
+                self.rows_offset, self.rows, dictionary_offset, len(encoded), MAGIC
+            )
+        )
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class RowReader:
+    """Memory-mapped reader of a binary row file.
+
+    Indexing returns rows as dicts of plain values: enum values, strings, Decimals, dates and datetimes.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Map the row file at path."""
+        with open(path, "rb") as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mapped)
+        self._buffer = buffer
+        magic, version, layout_length = _HEADER.unpack_from(buffer)
+        rows_offset, rows, dictionary_offset, string_count, footer_magic = (
+            _FOOTER.unpack_from(buffer, len(buffer) - _FOOTER.size)
+        )
+        if magic != MAGIC or footer_magic != MAGIC:
+            raise ValueError(f"Not a binary row file. Got {path}.")
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported binary row format version. Got {version}, expected {FORMAT_VERSION}."
+            )
+        layout = json.loads(
+            buffer[_HEADER.size : _HEADER.size + layout_length].tobytes()
+        )
+        self.schema_name: str = layout["schema"]
+        self.fields = tuple(
+            RowField(**{**field, "members": tuple(field["members"])})
+            for field in layout["fields"]
+        )
+        self._struct = _row_struct(self.fields)
+        self.rows_offset = rows_offset
+        self.rows = rows
+        self._offsets = buffer[
+            dictionary_offset : dictionary_offset + (string_count + 1) * 8
+        ].cast("Q")
+        self._strings_offset = dictionary_offset + (string_count + 1) * 8
+        self._decoders = [_decoder(field, self.string) for field in self.fields]
+        self._names = [field.name for field in self.fields]
+
+    def string(self, index: int) -> str:
+        """String at index in the string dictionary."""
+        start = self._strings_offset + self._offsets[index]
+        end = self._strings_offset + self._offsets[index + 1]
+        return str(self._buffer[start:end], "utf-8")
+
+    def _row(self, index: int) -> dict[str, Any]:
+        values = self._struct.unpack_from(
+            self._buffer, self.rows_offset + index * self._struct.size
+        )
+        return {
+            name: decode(value)
+            for name, decode, value in zip(
+                self._names, self._decoders, values, strict=True
+            )
+        }
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return self.rows
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(self, index: int | slice) -> dict[str, Any] | list[dict[str, Any]]:
+        """Row at index, or the rows in a slice."""
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(self.rows))]
+        if index < 0:
+            index += self.rows
+        if not 0 <= index < self.rows:
+            raise IndexError("Row index out of range.")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Rows in file order."""
+        for index in range(self.rows):
+            yield self._row(index)
+
+    def to_numpy(self, start: int = 0, stop: int | None = None) -> Any:
+        """Rows from start to stop as a NumPy structured array, without copying.
+
+        Enum fields hold the member codes and string fields the 1-based string indexes.
+        The array views the memory map, which stays mapped while the array is alive, also after close.
+        Requires NumPy.
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("NumPy is required to read rows as arrays.") from e
+        start, stop, _ = slice(start, stop).indices(self.rows)
+        dtype = np.dtype(
+            [(field.name, "=" + _NUMPY_TYPES[field.format]) for field in self.fields]
+        )
+        return np.frombuffer(
+            self._mapped,
+            dtype=dtype,
+            count=max(stop - start, 0),
+            offset=self.rows_offset + start * dtype.itemsize,
+        )
+
+    def close(self) -> None:
+        """Unmap the file, or leave it to the arrays returned by to_numpy that still view it."""
+        self._offsets.release()
+        self._buffer.release()
+        try:
+            self._mapped.close()
+        except BufferError:
+            # The map is closed when the last array viewing it is freed.
+            pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def write_rows(
+    path: str | Path, schema: type[BaseModel], items: Iterable[BaseModel]
+) -> int:
+    """Write items to a row file, returning the number of rows."""
+    with RowWriter(path, schema) as writer:
+        writer.write_many(items)
+    return writer.rows
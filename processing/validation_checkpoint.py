@@ -0,0 +1,187 @@
+"""Validation checkpoints.
+
+Saves the progress of a streaming report validation to a local file every so many items,
+so that a validation interrupted by a restart resumes from its last checkpoint
+instead of from the start of the report, with the same final result.
+
+A checkpoint holds the offset in the report after the last validated item, the item index,
+the counters of the result, the reference time of the validation clock and the state of the stages.
+Item errors are appended to a sidecar file at each checkpoint, so writing a checkpoint
+takes time for the items since the previous checkpoint and not for the whole report.
+Errors restored from a checkpoint are read back from JSON, like spilled errors.
+
+Example:
+    validator = ReportValidator(stages=[DayPartitioner(directory)])
+    result = validator.validate(path, checkpoint=f"{path}.checkpoint")
+"""
+
+import json
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+from ..utils.validation_clock import ValidationClock
+from .item_errors import decode_error, encode_error
+from .report_stream import ReportStream
+
+if TYPE_CHECKING:
+    from .report_validator import ItemStage, ValidationResult
+
+
+CHECKPOINT_VERSION = 1
+DEFAULT_CHECKPOINT_ITEMS = 1_000_000
+
+
+class CheckpointStage(Protocol):
+    """Pipeline stage that can be checkpointed."""
+
+    def checkpoint_state(self) -> Any:
+        """JSON serializable state after the items added so far."""
+
+    def restore_state(self, state: Any) -> None:
+        """Restore a state returned by checkpoint_state."""
+
+
+def source_identity(source: str | Path) -> dict[str, Any]:
+    """Path, size and modification time of a report file."""
+    stat = os.stat(source)
+    return {
+        "path": str(Path(source).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+class ValidationCheckpoint:
+    """Checkpoint file of the validation of a report file.
+
+    Loads the previous checkpoint of the report when the file exists.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        source: str | Path,
+        stages: Sequence["ItemStage"] = (),
+        every: int = DEFAULT_CHECKPOINT_ITEMS,
+    ) -> None:
+        """Set up checkpoints of the validation of source to path, every items validated.
+
+        Raises ValueError when a stage can not be checkpointed,
+        or when the checkpoint at path is of another version or report file.
+        """
+        for stage in stages:
+            if not hasattr(stage, "checkpoint_state"):
+                raise ValueError(
+                    f"Stage can not be checkpointed. Got {stage.__class__.__name__} without checkpoint_state."
+                )
+        self.path = Path(path)
+        self.errors_path = self.path.with_name(self.path.name + ".errors")
+        self.source = source_identity(source)
+        self.stages = stages
+        self.every = every
+        self.state: dict[str, Any] | None = None
+        self.checkpoints = 0
+        self._marks: deque[tuple[int, int]] = deque()
+        self._errors_written = 0
+        if self.path.exists():
+            self.state = self._load()
+        else:
+            # Errors written before the first checkpoint of an interrupted run.
+            self.errors_path.unlink(missing_ok=True)
+
+    def _load(self) -> dict[str, Any]:
+        state = json.loads(self.path.read_text(encoding="utf-8"))
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Unsupported checkpoint version. Got {state.get('version')}, expected {CHECKPOINT_VERSION}."
+            )
+        if state["source"] != self.source:
+            raise ValueError(
+                f"Checkpoint is of another report file. Got {state['source']}, expected {self.source}."
+            )
+        return state
+
+    @property
+    def resumed(self) -> bool:
+        """True when the validation resumes from a checkpoint."""
+        return self.state is not None
+
+    def clock(self) -> ValidationClock | None:
+        """Validation clock of the checkpointed run, None when not resumed."""
+        if self.state is None:
+            return None
+        return ValidationClock(datetime.fromisoformat(self.state["clock"]))
+
+    def restore(self, stream: ReportStream, result: "ValidationResult") -> int:
+        """Restore the result and stages and resume the items of stream, returns the items done.
+
+        The header of stream has to be validated first.
+        """
+        if self.state is None:
+            return 0
+        state = self.state
+        result.items = state["items"]
+        result.valid_items = state["valid_items"]
+        with open(self.errors_path, "r+b") as fp:
+            fp.truncate(state["errors_bytes"])
+            result.item_errors.extend(decode_error(line.decode("utf-8")) for line in fp)
+        self._errors_written = len(result.item_errors)
+        for stage, stage_state in zip(self.stages, state["stages"], strict=True):
+            stage.restore_state(stage_state)  # type: ignore[attr-defined]
+        stream.resume_items(state["offset"])
+        return state["items"]
+
+    def track(
+        self, stream: ReportStream, items: Iterable[Any], start: int
+    ) -> Iterator[Any]:
+        """Items of stream, marking the offset after every every-th item for a checkpoint."""
+        index = start
+        for item in items:
+            index += 1
+            if not index % self.every:
+                self._marks.append((index, stream.offset))
+            yield item
+
+    def done(
+        self, items: int, result: "ValidationResult", clock: ValidationClock
+    ) -> None:
+        """Called when the first items have been validated and collected in result.
+
+        Writes a checkpoint when items is at a mark.
+        """
+        if not self._marks or self._marks[0][0] != items:
+            return
+        _, offset = self._marks.popleft()
+        errors = len(result.item_errors)
+        with open(self.errors_path, "ab") as fp:
+            fp.writelines(
+                encode_error(error).encode("utf-8")
+                for error in result.item_errors.tail(errors - self._errors_written)
+            )
+            fp.flush()
+            os.fsync(fp.fileno())
+            errors_bytes = fp.tell()
+        self._errors_written = errors
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "source": self.source,
+            "clock": clock.now.isoformat(),
+            "offset": offset,
+            "items": items,
+            "valid_items": result.valid_items,
+            "errors_bytes": errors_bytes,
+            "stages": [stage.checkpoint_state() for stage in self.stages],  # type: ignore[attr-defined]
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self.checkpoints += 1
+
+    def remove(self) -> None:
+        """Remove the checkpoint files, when the validation has finished."""
+        self.path.unlink(missing_ok=True)
+        self.errors_path.unlink(missing_ok=True)
@@ -0,0 +1,190 @@
+"""Validation timing.
+
+Per-item validation latency histograms per schema, and capture of slow items,
+to find pathologically expensive items (for example very long ids or huge numeric strings) in production files.
+
+The histograms are log-linear (HDR-style): values are bucketed by their highest bits,
+so every bucket covers a fixed relative range and recording is a few integer operations.
+
+Example:
+    timer = ValidationTimer(slow_item_ns=1_000_000)
+    result = ReportValidator(timer=timer).validate(path)
+    print(timer.summary())
+"""
+
+import heapq
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import BaseModel
+
+SUB_BUCKET_BITS = 5
+"""Each power of two is divided into 2**SUB_BUCKET_BITS buckets, a relative precision of about 3%."""
+
+DEFAULT_SLOW_ITEM_NS = 1_000_000
+DEFAULT_MAX_SLOW_ITEMS = 100
+SUMMARY_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of latencies in nanoseconds."""
+
+    __slots__ = ("count", "counts", "max", "min", "total")
+
+    def __init__(self) -> None:
+        """Set up an empty histogram."""
+        buckets = (65 - SUB_BUCKET_BITS) << SUB_BUCKET_BITS
+        self.counts = array("Q", bytes(8 * buckets))
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket(ns: int) -> int:
+        """Bucket index of a latency."""
+        shift = max(ns.bit_length() - SUB_BUCKET_BITS - 1, 0)
+        return (shift << SUB_BUCKET_BITS) + (ns >> shift)
+
+    @staticmethod
+    def bucket_limit(bucket: int) -> int:
+        """Highest latency in a bucket."""
+        shift = max((bucket >> SUB_BUCKET_BITS) - 1, 0)
+        mantissa = bucket - (shift << SUB_BUCKET_BITS)
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, ns: int) -> None:
+        """Record a latency."""
+        ns = max(ns, 0)
+        self.counts[self.bucket(ns)] += 1
+        if not self.count or ns < self.min:
+            self.min = ns
+        self.max = max(self.max, ns)
+        self.count += 1
+        self.total += ns
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the latencies recorded in other."""
+        if not other.count:
+            return
+        for bucket, count in enumerate(other.counts):
+            if count:
+                self.counts[bucket] += count
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, percentile: float) -> int:
+        """Latency at or below which percentile percent of the latencies are, within the bucket precision."""
+        if not self.count:
+            return 0
+        rank = max(percentile / 100 * self.count, 1)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_limit(bucket), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """Mean latency."""
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class SlowItem:
+    """Item that took longer than the slow item threshold to validate."""
+
+    schema: str
+    index: int
+    ns: int
+    item: Any
+
+
+class ValidationTimer:
+    """Validation latencies per schema, and the slowest items above a threshold."""
+
+    def __init__(
+        self,
+        slow_item_ns: int = DEFAULT_SLOW_ITEM_NS,
+        max_slow_items: int = DEFAULT_MAX_SLOW_ITEMS,
+    ) -> None:
+        """Set up timer keeping at most max_slow_items of the items slower than slow_item_ns."""
+        self.slow_item_ns = slow_item_ns
+        self.max_slow_items = max_slow_items
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self._slow_items: list[tuple[int, int, SlowItem]] = []
+
+    def histogram(self, schema: type[BaseModel]) -> LatencyHistogram:
+        """Histogram of a schema."""
+        histogram = self.histograms.get(schema.__name__)
+        if histogram is None:
+            histogram = self.histograms[schema.__name__] = LatencyHistogram()
+        return histogram
+
+    def record(self, schema: type[BaseModel], index: int, item: Any, ns: int) -> None:
+        """Record the validation latency of the item at index."""
+        self.histogram(schema).record(ns)
+        if ns >= self.slow_item_ns:
+            self._capture(SlowItem(schema.__name__, index, ns, item))
+
+    def record_batch(
+        self,
+        schema: type[BaseModel],
+        start: int,
+        items: Sequence[Any],
+        latencies: Iterable[int],
+    ) -> None:
+        """Record the validation latencies of a batch of items starting at index start."""
+        histogram = self.histogram(schema)
+        for index, (item, ns) in enumerate(zip(items, latencies, strict=True), start):
+            histogram.record(ns)
+            if ns >= self.slow_item_ns:
+                self._capture(SlowItem(schema.__name__, index, ns, item))
+
+    def _capture(self, slow_item: SlowItem) -> None:
+        entry = (slow_item.ns, -slow_item.index, slow_item)
+        if len(self._slow_items) < self.max_slow_items:
+            heapq.heappush(self._slow_items, entry)
+        elif self._slow_items and entry[:2] > self._slow_items[0][:2]:
+            heapq.heapreplace(self._slow_items, entry)
+
+    @property
+    def slow_items(self) -> list[SlowItem]:
+        """Captured slow items, slowest first."""
+        return [
+            slow_item
+            for _, _, slow_item in sorted(
+                self._slow_items, key=lambda entry: entry[:2], reverse=True
+            )
+        ]
+
+    def summary(self, max_item_length: int = 200) -> str:
+        """Summary of the latencies per schema and the slow items, in microseconds."""
+        lines = []
+        for schema, histogram in sorted(self.histograms.items()):
+            percentiles = ", ".join(
+                f"p{percentile:g} {histogram.percentile(percentile) / 1000:.1f}"
+                for percentile in SUMMARY_PERCENTILES
+            )
+            lines.append(
+                f"{schema}: {histogram.count} items, mean {histogram.mean / 1000:.1f}, "
+                f"{percentiles}, max {histogram.max / 1000:.1f} µs"
+            )
+        slow_items = self.slow_items
+        if slow_items:
+            lines.append(
+                f"Slow items (>= {self.slow_item_ns / 1000:.1f} µs): {len(slow_items)}"
+            )
+            for slow_item in slow_items:
+                item = repr(slow_item.item)
+                if len(item) > max_item_length:
+                    item = item[:max_item_length] + "..."
+                lines.append(
+                    f"  {slow_item.schema} item {slow_item.index}: {slow_item.ns / 1000:.1f} µs {item}"
+                )
+        return "\n".join(lines)
@@ -12,6 +12,7 @@ item 11. Over the counter (OTC) cash deposits,
 item 12. Over the counter (OTC) cash withdrawals.
 """
 
+from datetime import date
 from typing import Literal
 
 from pydantic import (
@@ -74,12 +75,12 @@ class AggregateReport(BaseReport, extra="forbid"):
 
     @field_validator("date_from", mode="before")
     @classmethod
-    def validate_date_from(cls, date_from: str) -> str:
+    def validate_date_from(cls, date_from: str) -> date | str:
         """Validate format of date_from."""
         return validate_date(date_from)
 
     @field_validator("date_to", mode="before")
     @classmethod
-    def validate_date_to(cls, date_to: str) -> str:
+    def validate_date_to(cls, date_to: str) -> date | str:
         """Validate format of date_to."""
         return validate_date(date_to)
@@ -8,6 +8,7 @@ item 11. Over the counter (OTC) cash deposits,
 item 12. Over the counter (OTC) cash withdrawals.
 """
 
+from datetime import date
 from decimal import Decimal
 from typing import Self
 
@@ -16,6 +17,7 @@ from pydantic import (
     Field,
     PastDate,
     ValidationError,
+    ValidationInfo,
     field_validator,
     model_validator,
 )
@@ -65,6 +67,7 @@ from ..utils.model_validation_functions import (
     validate_payment_type_and_reported_payment_type,
 )
 from ..utils.types import Country, Currency
+from ..utils.validation_context import ReportContext, report_context, rules_deferred
 
 
 class BaseAggregate(BaseModel, extra="forbid"):
@@ -133,7 +136,7 @@ class BaseAggregate(BaseModel, extra="forbid"):
 
     @field_validator("transaction_day", mode="before")
     @classmethod
-    def validate_timestamp_transaction_day(cls, v: str) -> str:
+    def validate_timestamp_transaction_day(cls, v: str) -> date | str:
         """Validate date format."""
         return validate_date(v)
 
@@ -201,23 +204,30 @@ class EMoney(BaseAggregate, extra="forbid"):
         return validate_country(counterparty_country)
 
     @model_validator(mode="after")
-    def validate_model(self) -> Self:
+    def validate_model(self, info: ValidationInfo) -> Self:
         """Validates model."""
+        if rules_deferred(info):
+            return self
+        errors = self.rule_errors(report_context(self, info))
+        if errors:
+            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
+
+        return self
+
+    def rule_errors(self, context: ReportContext) -> list[InitErrorDetails]:
+        """Errors of the cross-field rules, returned instead of raised."""
         errors: list[InitErrorDetails] = []
 
         # Test for payment_type vs reported_payment_type is redundant since credit_transfer is limited to one payment_type.
         # If payment_type != "EMP0" the validation against PaymentTypeEMoney will fail.
 
-        if self.date_from and self.date_to and self.transaction_day:
+        if context.date_from and context.date_to and self.transaction_day:
             if result := valdate_transaction_day_between_dates(
-                self.transaction_day, self.date_from, self.date_to
+                self.transaction_day, context.date_from, context.date_to
             ):
                 errors.append(result)
 
-        if errors:
-            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
-
-        return self
+        return errors
 
 
 class MoneyRemittances(BaseAggregate, extra="forbid"):
@@ -283,23 +293,30 @@ class MoneyRemittances(BaseAggregate, extra="forbid"):
         return validate_country(initiation_country)
 
     @model_validator(mode="after")
-    def validate_model(self) -> Self:
+    def validate_model(self, info: ValidationInfo) -> Self:
         """Validates model."""
+        if rules_deferred(info):
+            return self
+        errors = self.rule_errors(report_context(self, info))
+        if errors:
+            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
+
+        return self
+
+    def rule_errors(self, context: ReportContext) -> list[InitErrorDetails]:
+        """Errors of the cross-field rules, returned instead of raised."""
         errors: list[InitErrorDetails] = []
 
         # Test for payment_type vs reported_payment_type is redundant since credit_transfer is limited to one payment_type.
         # If payment_type != "MREM" the validation against PaymentTypeMoneyRemitances will fail.
 
-        if self.date_from and self.date_to and self.transaction_day:
+        if context.date_from and context.date_to and self.transaction_day:
             if result := valdate_transaction_day_between_dates(
-                self.transaction_day, self.date_from, self.date_to
+                self.transaction_day, context.date_from, context.date_to
             ):
                 errors.append(result)
 
-        if errors:
-            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
-
-        return self
+        return errors
 
 
 class OTC(BaseAggregate, extra="forbid"):
@@ -325,26 +342,33 @@ class OTC(BaseAggregate, extra="forbid"):
     )
 
     @model_validator(mode="after")
-    def validate_model(self) -> Self:
+    def validate_model(self, info: ValidationInfo) -> Self:
         """Validates model."""
+        if rules_deferred(info):
+            return self
+        errors = self.rule_errors(report_context(self, info))
+        if errors:
+            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
+
+        return self
+
+    def rule_errors(self, context: ReportContext) -> list[InitErrorDetails]:
+        """Errors of the cross-field rules, returned instead of raised."""
         errors: list[InitErrorDetails] = []
 
-        if self.reported_payment_type:
+        if context.reported_payment_type:
             if result := validate_payment_type_and_reported_payment_type(
-                self.payment_type, self.reported_payment_type
+                self.payment_type, context.reported_payment_type
             ):
                 errors.append(result)
 
-        if self.date_from and self.date_to and self.transaction_day:
+        if context.date_from and context.date_to and self.transaction_day:
             if result := valdate_transaction_day_between_dates(
-                self.transaction_day, self.date_from, self.date_to
+                self.transaction_day, context.date_from, context.date_to
             ):
                 errors.append(result)
 
-        if errors:
-            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
-
-        return self
+        return errors
 
 
 class PaymentInitiationServices(BaseAggregate, extra="forbid"):
@@ -410,20 +434,27 @@ class PaymentInitiationServices(BaseAggregate, extra="forbid"):
         return validate_country(initiation_country)
 
     @model_validator(mode="after")
-    def validate_model(self) -> Self:
+    def validate_model(self, info: ValidationInfo) -> Self:
         """Validates model."""
+        if rules_deferred(info):
+            return self
+        errors = self.rule_errors(report_context(self, info))
+        if errors:
+            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
+
+        return self
+
+    def rule_errors(self, context: ReportContext) -> list[InitErrorDetails]:
+        """Errors of the cross-field rules, returned instead of raised."""
         errors: list[InitErrorDetails] = []
 
         # Test for payment_type vs reported_payment_type is redundant since credit_transfer is limited to one payment_type.
         # If payment_type != "PI" the validation against PaymentTypePaymentInitiationServices will fail.
 
-        if self.date_from and self.date_to and self.transaction_day:
+        if context.date_from and context.date_to and self.transaction_day:
             if result := valdate_transaction_day_between_dates(
-                self.transaction_day, self.date_from, self.date_to
+                self.transaction_day, context.date_from, context.date_to
             ):
                 errors.append(result)
 
-        if errors:
-            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
-
-        return self
+        return errors
@@ -4,6 +4,7 @@ This schema is used to report the specific overall file information.
 The information should be included in each file sent.
 """
 
+from datetime import datetime
 from typing import Any
 
 from pydantic import (
@@ -77,6 +78,6 @@ class BaseReport(BaseModel, extra="forbid"):
 
     @field_validator("report_datetime", mode="before")
     @classmethod
-    def validate_report_datetime(cls, report_datetime: str) -> str:
+    def validate_report_datetime(cls, report_datetime: str) -> datetime | str:
         """Validate that report date is in correct format."""
         return validate_timestamp(report_datetime)
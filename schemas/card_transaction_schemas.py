@@ -16,12 +16,14 @@ defined in transaction_schemas.py.
 BaseTransaction consist of all attributes that are relevant for all the items in the regulation that are reported transactions by transaction.
 """
 
+from datetime import date, datetime
 from decimal import Decimal
 
 from pydantic import (
     Field,
     PastDate,
     ValidationError,
+    ValidationInfo,
     field_validator,
     model_validator,
 )
@@ -82,6 +84,7 @@ from ..utils.types import (
     Currency,
     MerchantCategory,
 )
+from ..utils.validation_context import ReportContext, report_context, rules_deferred
 
 
 class BaseCardPayment(BaseTransaction, extra="forbid"):
@@ -148,13 +151,15 @@ class BaseCardPayment(BaseTransaction, extra="forbid"):
 
     @field_validator("transaction_initiated", mode="before")
     @classmethod
-    def validate_timestamp_transaction_initiated(cls, v: str | None) -> str | None:
+    def validate_timestamp_transaction_initiated(
+        cls, v: str | None
+    ) -> datetime | str | None:
         """Validate timestamp."""
         return validate_optional_timestamp(v)
 
     @field_validator("transaction_cleared", mode="before")
     @classmethod
-    def validate_timestamp_transaction_cleared(cls, v: str) -> str:
+    def validate_timestamp_transaction_cleared(cls, v: str) -> date | str:
         """Validate timestamp."""
         return validate_date(v)
 
@@ -251,8 +256,18 @@ class CardPaymentIssuer(BaseCardPayment, extra="forbid"):
             )
 
     @model_validator(mode="after")
-    def validate_model(self) -> Self:  # noqa: C901
+    def validate_model(self, info: ValidationInfo) -> Self:
         """Validates model."""
+        if rules_deferred(info):
+            return self
+        errors = self.rule_errors(report_context(self, info))
+        if errors:
+            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
+
+        return self
+
+    def rule_errors(self, context: ReportContext) -> list[InitErrorDetails]:
+        """Errors of the cross-field rules, returned instead of raised."""
         errors: list[InitErrorDetails] = []
 
         if self.initiation_channel in (2221, 2222) and self.remote_initiation == "R":
@@ -307,22 +322,19 @@ class CardPaymentIssuer(BaseCardPayment, extra="forbid"):
                 )
             )
 
-        if self.reported_payment_type:
+        if context.reported_payment_type:
             if result := validate_payment_type_and_reported_payment_type(
-                self.payment_type, self.reported_payment_type
+                self.payment_type, context.reported_payment_type
             ):
                 errors.append(result)
 
-        if self.date_from and self.date_to:
+        if context.date_from and context.date_to:
             if result := valdate_transaction_cleared_between_dates(
-                self.transaction_cleared, self.date_from, self.date_to
+                self.transaction_cleared, context.date_from, context.date_to
             ):
                 errors.append(result)
 
-        if errors:
-            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
-
-        return self
+        return errors
 
 
 class CardPaymentAcquirer(BaseCardPayment, extra="forbid"):
@@ -382,8 +394,18 @@ class CardPaymentAcquirer(BaseCardPayment, extra="forbid"):
         return validate_country(counterparty_country)
 
     @model_validator(mode="after")
-    def validate_model(self) -> Self:  # noqa: C901
+    def validate_model(self, info: ValidationInfo) -> Self:
         """Validates model."""
+        if rules_deferred(info):
+            return self
+        errors = self.rule_errors(report_context(self, info))
+        if errors:
+            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
+
+        return self
+
+    def rule_errors(self, context: ReportContext) -> list[InitErrorDetails]:
+        """Errors of the cross-field rules, returned instead of raised."""
         errors: list[InitErrorDetails] = []
 
         if self.initiation_channel == 2222 and self.remote_initiation == "R":
@@ -438,19 +460,16 @@ class CardPaymentAcquirer(BaseCardPayment, extra="forbid"):
                 )
             )
 
-        if self.reported_payment_type:
+        if context.reported_payment_type:
             if result := validate_payment_type_and_reported_payment_type(
-                self.payment_type, self.reported_payment_type
+                self.payment_type, context.reported_payment_type
             ):
                 errors.append(result)
 
-        if self.date_from and self.date_to:
+        if context.date_from and context.date_to:
             if result := valdate_transaction_cleared_between_dates(
-                self.transaction_cleared, self.date_from, self.date_to
+                self.transaction_cleared, context.date_from, context.date_to
             ):
                 errors.append(result)
 
-        if errors:
-            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
-
-        return self
+        return errors
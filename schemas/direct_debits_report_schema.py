@@ -5,6 +5,7 @@ in addition to the base report schema,
 that should be reported for direct debits item 7 in the regulations.
 """
 
+from datetime import date
 from typing import Literal
 
 from pydantic import (
@@ -60,7 +61,6 @@ class DirectDebitsReport(BaseReport, extra="forbid"):
 
     @field_validator("period", mode="before")
     @classmethod
-    def validate_period(cls, period: str) -> str:
+    def validate_period(cls, period: str) -> date | str:
         """Validates that period is valid date and last day of month."""
-        _ = validate_date(period)
-        return validate_last_day_of_month(period)
+        return validate_last_day_of_month(validate_date(period))
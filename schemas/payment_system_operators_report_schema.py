@@ -5,6 +5,7 @@ in addition to the base report schema,
 that should be reported for all the items in Section 7 of the regulations.
 """
 
+from datetime import date
 from typing import Literal
 
 from pydantic import Field, PastDate, field_validator
@@ -53,6 +54,6 @@ class PaymentSystemOperatorsReport(BaseReport, extra="forbid"):
 
     @field_validator("period", mode="before")
     @classmethod
-    def validate_period(cls, period: str) -> str:
+    def validate_period(cls, period: str) -> date:
         """Make sure that period is the last day of each quarter."""
         return validate_quarterly(period)
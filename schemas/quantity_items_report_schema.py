@@ -12,6 +12,7 @@ item 16. E-money card terminals,
 item 17. ATMs.
 """
 
+from datetime import date
 from typing import Literal
 
 from pydantic import (
@@ -64,6 +65,6 @@ class QuantityItemsReport(BaseReport, extra="forbid"):
 
     @field_validator("period", mode="before")
     @classmethod
-    def validate_period(cls, period: str) -> str:
+    def validate_period(cls, period: str) -> date:
         """Make sure that period is the last day of each half year."""
         return validate_half_year(period)
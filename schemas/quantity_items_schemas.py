@@ -10,7 +10,15 @@ item 17. ATMs.
 
 from typing import Self
 
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    ValidationError,
+    ValidationInfo,
+    field_validator,
+    model_validator,
+)
+from pydantic_core import InitErrorDetails
 
 from ..enums.field_metadata_enums import (
     CardFunctionMeta,
@@ -47,7 +55,9 @@ from ..enums.quantity_items_enums import (
     TerminalFunctionPosTerminal,
 )
 from ..utils.field_validaton_functions import validate_country
+from ..utils.model_validation_functions import model_validation_error
 from ..utils.types import Country
+from ..utils.validation_context import EMPTY_CONTEXT, ReportContext, rules_deferred
 
 
 class BaseQuantityItems(BaseModel, extra="forbid"):
@@ -153,23 +163,43 @@ class Cards(BaseQuantityItems, extra="forbid"):
     # Validation that the attribute emoney function is reported if e-money function is reported in attribute card_function.
     # Validation that the attribute emoney function not is reported if e-money function not is reported in attribute card_function.
     @model_validator(mode="after")
-    def validate_emoney_function_and_card_function(self) -> Self:
+    def validate_emoney_function_and_card_function(self, info: ValidationInfo) -> Self:
         """E money function and card function validation.
 
         Attribute e-money function should be reported when the card has e-money functions.
         Attribute e-money function should not be reported when the card hasn't e-money functions.
         """
+        if rules_deferred(info):
+            return self
+        errors = self.rule_errors(EMPTY_CONTEXT)
+        if errors:
+            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
+
+        return self
+
+    def rule_errors(self, context: ReportContext) -> list[InitErrorDetails]:
+        """Errors of the cross-field rules, returned instead of raised."""
+        errors: list[InitErrorDetails] = []
+
         if not self.e_money_function and self.card_function in ["CF3", "CF5", "CF6"]:
-            raise ValueError(
-                "Attribute e-money function has to be reported when the card has e-money functions."
+            errors.append(
+                model_validation_error(
+                    (),
+                    f"{self.card_function}, {self.e_money_function}",
+                    "Attribute e-money function has to be reported when the card has e-money functions.",
+                )
             )
 
         if self.e_money_function and self.card_function in ["CF1", "CF2", "CF4"]:
-            raise ValueError(
-                "Attribute e-money function should not to be reported when the card hasn't e-money functions."
+            errors.append(
+                model_validation_error(
+                    (),
+                    f"{self.card_function}, {self.e_money_function}",
+                    "Attribute e-money function should not to be reported when the card hasn't e-money functions.",
+                )
             )
 
-        return self
+        return errors
 
 
 class PosTerminals(BaseQuantityItemsMerchantLocation, extra="forbid"):
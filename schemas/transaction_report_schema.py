@@ -13,6 +13,7 @@ item 5. Cash advance at point of sale (POS) terminals.
 item 6. ATM cash deposit.
 """
 
+from datetime import date
 from typing import Literal
 
 from pydantic import (
@@ -75,12 +76,12 @@ class TransactionReport(BaseReport, extra="forbid"):
 
     @field_validator("date_from", mode="before")
     @classmethod
-    def validate_date_from(cls, date_from: str) -> str:
+    def validate_date_from(cls, date_from: str) -> date | str:
         """Validate format of date_from."""
         return validate_date(date_from)
 
     @field_validator("date_to", mode="before")
     @classmethod
-    def validate_date_to(cls, date_to: str) -> str:
+    def validate_date_to(cls, date_to: str) -> date | str:
         """Validate format of date_to."""
         return validate_date(date_to)
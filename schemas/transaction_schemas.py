@@ -7,6 +7,7 @@ item 4. ATM cash withdrawal,
 item 6. ATM cash deposit.
 """
 
+from datetime import date, datetime
 from decimal import Decimal
 
 from pydantic import (
@@ -14,6 +15,7 @@ from pydantic import (
     Field,
     PastDate,
     ValidationError,
+    ValidationInfo,
     field_validator,
     model_validator,
 )
@@ -80,6 +82,7 @@ from ..utils.types import (
     Locality,
     SniCode,
 )
+from ..utils.validation_context import ReportContext, report_context, rules_deferred
 
 
 class BaseTransaction(BaseModel, extra="forbid"):
@@ -221,13 +224,23 @@ class CashTransactionsATMOwners(BaseTransaction, extra="forbid"):
 
     @field_validator("transaction_day", mode="before")
     @classmethod
-    def validate_timestamp_transaction_day(cls, v: str) -> str:
+    def validate_timestamp_transaction_day(cls, v: str) -> date | str:
         """Validate timestamp."""
         return validate_date(v)
 
     @model_validator(mode="after")
-    def validate_model(self) -> Self:
+    def validate_model(self, info: ValidationInfo) -> Self:
         """Validates model."""
+        if rules_deferred(info):
+            return self
+        errors = self.rule_errors(report_context(self, info))
+        if errors:
+            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
+
+        return self
+
+    def rule_errors(self, context: ReportContext) -> list[InitErrorDetails]:
+        """Errors of the cross-field rules, returned instead of raised."""
         errors: list[InitErrorDetails] = []
 
         if self.merchant_location == "SE" and not self.locality:
@@ -266,22 +279,19 @@ class CashTransactionsATMOwners(BaseTransaction, extra="forbid"):
                 )
             )
 
-        if self.reported_payment_type:
+        if context.reported_payment_type:
             if result := validate_payment_type_and_reported_payment_type(
-                self.payment_type, self.reported_payment_type
+                self.payment_type, context.reported_payment_type
             ):
                 errors.append(result)
 
-        if self.date_from and self.date_to and self.transaction_day:
+        if context.date_from and context.date_to and self.transaction_day:
             if result := valdate_transaction_day_between_dates(
-                self.transaction_day, self.date_from, self.date_to
+                self.transaction_day, context.date_from, context.date_to
             ):
                 errors.append(result)
 
-        if errors:
-            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
-
-        return self
+        return errors
 
 
 class CreditTransfer(BaseTransaction, extra="forbid"):
@@ -362,13 +372,23 @@ class CreditTransfer(BaseTransaction, extra="forbid"):
 
     @field_validator("transaction_day", mode="before")
     @classmethod
-    def validate_timestamp_transaction_day(cls, v: str) -> str:
+    def validate_timestamp_transaction_day(cls, v: str) -> date | str:
         """Validate timestamp."""
         return validate_date(v)
 
     @model_validator(mode="after")
-    def validate_model(self) -> Self:  # noqa: C901
+    def validate_model(self, info: ValidationInfo) -> Self:
         """Validates model."""
+        if rules_deferred(info):
+            return self
+        errors = self.rule_errors(report_context(self, info))
+        if errors:
+            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
+
+        return self
+
+    def rule_errors(self, context: ReportContext) -> list[InitErrorDetails]:
+        """Errors of the cross-field rules, returned instead of raised."""
         errors: list[InitErrorDetails] = []
 
         if self.initiation_channel == 2220 and self.remote_initiation == "R":
@@ -401,6 +421,24 @@ class CreditTransfer(BaseTransaction, extra="forbid"):
                 )
             )
 
+        errors.extend(self._role_errors())
+        errors.extend(self._sni_code_errors())
+
+        # Test for payment_type vs reported_payment_type is redundant since credit_transfer is limited to one payment_type.
+        # If payment_type != "CT0" the validation against PaymentTypeCreditTransfer will fail.
+
+        if context.date_from and context.date_to and self.transaction_day:
+            if result := valdate_transaction_day_between_dates(
+                self.transaction_day, context.date_from, context.date_to
+            ):
+                errors.append(result)
+
+        return errors
+
+    def _role_errors(self) -> list[InitErrorDetails]:
+        """Errors of the rules on fields reported by the payer's or the payee's PSP."""
+        errors: list[InitErrorDetails] = []
+
         if self.initiation_channel is None and self.role_in_transaction == 1:
             errors.append(
                 model_validation_error(
@@ -437,6 +475,12 @@ class CreditTransfer(BaseTransaction, extra="forbid"):
                 )
             )
 
+        return errors
+
+    def _sni_code_errors(self) -> list[InitErrorDetails]:
+        """Errors of the rules on the sni code."""
+        errors: list[InitErrorDetails] = []
+
         if (
             self.sni_code is None
             and self.role_in_transaction == 2
@@ -472,19 +516,7 @@ class CreditTransfer(BaseTransaction, extra="forbid"):
                 )
             )
 
-        # Test for payment_type vs reported_payment_type is redundant since credit_transfer is limited to one payment_type.
-        # If payment_type != "CT0" the validation against PaymentTypeCreditTransfer will fail.
-
-        if self.date_from and self.date_to and self.transaction_day:
-            if result := valdate_transaction_day_between_dates(
-                self.transaction_day, self.date_from, self.date_to
-            ):
-                errors.append(result)
-
-        if errors:
-            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
-
-        return self
+        return errors
 
 
 class InstantCreditTransfer(BaseTransaction, extra="forbid"):
@@ -585,13 +617,23 @@ class InstantCreditTransfer(BaseTransaction, extra="forbid"):
 
     @field_validator("transaction_time", mode="before")
     @classmethod
-    def validate_timestamp_transaction_initiated(cls, v: str) -> str:
+    def validate_timestamp_transaction_initiated(cls, v: str) -> datetime | str:
         """Validate timestamp."""
         return validate_timestamp(v)
 
     @model_validator(mode="after")
-    def validate_model(self) -> Self:  # noqa: C901
+    def validate_model(self, info: ValidationInfo) -> Self:
         """Validates model."""
+        if rules_deferred(info):
+            return self
+        errors = self.rule_errors(report_context(self, info))
+        if errors:
+            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
+
+        return self
+
+    def rule_errors(self, context: ReportContext) -> list[InitErrorDetails]:
+        """Errors of the cross-field rules, returned instead of raised."""
         errors: list[InitErrorDetails] = []
 
         if self.initiation_channel == 2220 and self.remote_initiation == "R":
@@ -624,6 +666,25 @@ class InstantCreditTransfer(BaseTransaction, extra="forbid"):
                 )
             )
 
+        errors.extend(self._account_errors())
+        errors.extend(self._role_errors())
+        errors.extend(self._sni_code_errors())
+
+        # Test for payment_type vs reported_payment_type is redundant since credit_transfer is limited to one payment_type.
+        # If payment_type != "CT1" the validation against PaymentTypeInstantCreditTransfer will fail.
+
+        if context.date_from and context.date_to and self.transaction_time:
+            if result := valdate_transaction_time_between_dates(
+                self.transaction_time, context.date_from, context.date_to
+            ):
+                errors.append(result)
+
+        return errors
+
+    def _account_errors(self) -> list[InitErrorDetails]:
+        """Errors of the rules on account currency and account value."""
+        errors: list[InitErrorDetails] = []
+
         if self.account_currency is None and self.role_in_transaction == 1:
             errors.append(
                 model_validation_error(
@@ -660,6 +721,12 @@ class InstantCreditTransfer(BaseTransaction, extra="forbid"):
                 )
             )
 
+        return errors
+
+    def _role_errors(self) -> list[InitErrorDetails]:
+        """Errors of the rules on fields reported by the payer's or the payee's PSP."""
+        errors: list[InitErrorDetails] = []
+
         if self.initiation_channel is None and self.role_in_transaction == 1:
             errors.append(
                 model_validation_error(
@@ -696,6 +763,12 @@ class InstantCreditTransfer(BaseTransaction, extra="forbid"):
                 )
             )
 
+        return errors
+
+    def _sni_code_errors(self) -> list[InitErrorDetails]:
+        """Errors of the rules on the sni code."""
+        errors: list[InitErrorDetails] = []
+
         if (
             self.sni_code is None
             and self.role_in_transaction == 2
@@ -731,16 +804,4 @@ class InstantCreditTransfer(BaseTransaction, extra="forbid"):
                 )
             )
 
-        # Test for payment_type vs reported_payment_type is redundant since credit_transfer is limited to one payment_type.
-        # If payment_type != "CT1" the validation against PaymentTypeInstantCreditTransfer will fail.
-
-        if self.date_from and self.date_to and self.transaction_time:
-            if result := valdate_transaction_time_between_dates(
-                self.transaction_time, self.date_from, self.date_to
-            ):
-                errors.append(result)
-
-        if errors:
-            raise ValidationError.from_exception_data(self.__class__.__name__, errors)
-
-        return self
+        return errors
@@ -0,0 +1,53 @@
+"""Codelist normalizer.
+
+Maps raw input for codelist-valued fields (currency, country, merchant category, sni code, locality)
+to one interned canonical code, so validated models share one string object per distinct code.
+
+Codes are looked up as given first, which is the common case.
+Other spellings (for example lower case) are upper-cased once and kept in a bounded LRU cache,
+so adversarial inputs can not grow the cache without limit.
+"""
+
+import sys
+from collections.abc import Iterable
+from functools import lru_cache
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class CodelistNormalizer:
+    """Codelist normalizer.
+
+    Calling the normalizer returns the canonical code, or None when the input is not in the codelist.
+    """
+
+    __slots__ = ("_canonical", "_lookup")
+
+    def __init__(
+        self, codes: Iterable[str | int], cache_size: int = DEFAULT_CACHE_SIZE
+    ) -> None:
+        """Set up normalizer for the codes in a codelist."""
+        canonical: dict[str, str] = {}
+        for code in codes:
+            code = sys.intern(str(code))
+            canonical[code] = code
+        self._canonical = canonical
+        self._lookup = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def _normalize(self, v: str) -> str | None:
+        return self._canonical.get(v.upper())
+
+    def __call__(self, v: str) -> str | None:
+        """Canonical code for v, None when v is not in the codelist."""
+        canonical = self._canonical.get(v)
+        if canonical is not None:
+            return canonical
+        return self._lookup(v)
+
+    def __contains__(self, v: str) -> bool:
+        """True when v is in the codelist."""
+        return self(v) is not None
+
+    def __len__(self) -> int:
+        """Number of codes in the codelist."""
+        return len(self._canonical)
@@ -0,0 +1,129 @@
+"""Date and timestamp parsing.
+
+Single-pass parsers for the '%Y-%m-%d' and '%Y-%m-%dT%H:%M:%S' formats.
+The shape of the string is checked by fixed offsets and the date or datetime is produced directly,
+so the value does not have to be matched by a regular expression and then parsed again by Pydantic.
+
+The column functions convert whole string columns into day numbers (days since 1970-01-01)
+or epoch seconds, for batch processing.
+"""
+
+from array import array
+from collections.abc import Iterable
+from datetime import date, datetime
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+INVALID_DAY = -(2**31)
+"""Day number of values in a date column that are not valid dates."""
+
+INVALID_TIMESTAMP = -(2**63)
+"""Epoch seconds of values in a timestamp column that are not valid timestamps."""
+
+
+def is_date_shape(v: str) -> bool:
+    """True when v has the shape YYYY-MM-DD."""
+    return (
+        len(v) == 10
+        and v[4] == "-"
+        and v[7] == "-"
+        and v[:4].isdecimal()
+        and v[5:7].isdecimal()
+        and v[8:].isdecimal()
+    )
+
+
+def is_timestamp_shape(v: str) -> bool:
+    """True when v has the shape YYYY-MM-DDTHH:MM:SS."""
+    return (
+        len(v) == 19
+        and v[10] == "T"
+        and v[13] == ":"
+        and v[16] == ":"
+        and is_date_shape(v[:10])
+        and v[11:13].isdecimal()
+        and v[14:16].isdecimal()
+        and v[17:].isdecimal()
+    )
+
+
+def parse_date(v: str) -> date | None:
+    """Date from a YYYY-MM-DD string, None when v does not have that shape or is not a valid date."""
+    if (
+        isinstance(v, str)
+        and len(v) == 10
+        and v[4] == "-"
+        and v[7] == "-"
+        and v.isascii()
+    ):
+        try:
+            return date.fromisoformat(v)
+        except ValueError:
+            return None
+    return None
+
+
+def parse_timestamp(v: str) -> datetime | None:
+    """Datetime from a YYYY-MM-DDTHH:MM:SS string, None when v does not have that shape or is not valid."""
+    if (
+        isinstance(v, str)
+        and len(v) == 19
+        and v[10] == "T"
+        and v[13] == ":"
+        and v[16] == ":"
+        and v[4] == "-"
+        and v[7] == "-"
+        and v.isascii()
+    ):
+        try:
+            return datetime.fromisoformat(v)
+        except ValueError:
+            return None
+    return None
+
+
+def to_day_number(v: date) -> int:
+    """Days since 1970-01-01."""
+    return v.toordinal() - EPOCH_ORDINAL
+
+
+def to_epoch_seconds(v: datetime) -> int:
+    """Seconds since 1970-01-01T00:00:00, of the local time of v."""
+    return (
+        (v.toordinal() - EPOCH_ORDINAL) * 86400
+        + v.hour * 3600
+        + v.minute * 60
+        + v.second
+    )
+
+
+def date_column_to_day_numbers(values: Iterable[str]) -> array:
+    """Day numbers (days since 1970-01-01) as an int32 array.
+
+    Values that are not valid dates get INVALID_DAY.
+    Dates in a report column have low cardinality, so each distinct string is only parsed once.
+    """
+    cache: dict[str, int] = {}
+    days = array("i")
+    append = days.append
+    for v in values:
+        day = cache.get(v)
+        if day is None:
+            parsed = parse_date(v)
+            day = INVALID_DAY if parsed is None else to_day_number(parsed)
+            if isinstance(v, str):
+                cache[v] = day
+        append(day)
+    return days
+
+
+def timestamp_column_to_epoch_seconds(values: Iterable[str]) -> array:
+    """Seconds since 1970-01-01T00:00:00 (naive local time) as an int64 array.
+
+    Values that are not valid timestamps get INVALID_TIMESTAMP.
+    """
+    seconds = array("q")
+    append = seconds.append
+    for v in values:
+        parsed = parse_timestamp(v)
+        append(INVALID_TIMESTAMP if parsed is None else to_epoch_seconds(parsed))
+    return seconds
@@ -0,0 +1,123 @@
+"""Schemas per report family.
+
+Imports the schemas of a single report family, for worker processes that only validate
+reports of that family. type_mapping imports the schemas of all families.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import cache
+from importlib import import_module
+from types import MappingProxyType
+
+from pydantic import BaseModel
+
+
+@dataclass(frozen=True, slots=True)
+class FamilySchemaPaths:
+    """Report schema, item schemas and reported type fields of a report family.
+
+    Schemas are given as module.class in the schemas package.
+    """
+
+    report: str
+    items: tuple[str, ...]
+    reported_type_field: str
+    item_type_field: str
+
+
+FAMILY_SCHEMA_PATHS: Mapping[str, FamilySchemaPaths] = MappingProxyType(
+    {
+        "transactions": FamilySchemaPaths(
+            "transaction_report_schema.TransactionReport",
+            (
+                "card_transaction_schemas.CardPaymentAcquirer",
+                "card_transaction_schemas.CardPaymentIssuer",
+                "transaction_schemas.CashTransactionsATMOwners",
+                "transaction_schemas.CreditTransfer",
+                "transaction_schemas.InstantCreditTransfer",
+            ),
+            "reported_payment_type",
+            "payment_type",
+        ),
+        "aggregates": FamilySchemaPaths(
+            "aggregate_report_schema.AggregateReport",
+            (
+                "aggregate_schemas.EMoney",
+                "aggregate_schemas.OTC",
+                "aggregate_schemas.MoneyRemittances",
+                "aggregate_schemas.PaymentInitiationServices",
+            ),
+            "reported_payment_type",
+            "payment_type",
+        ),
+        "direct_debits": FamilySchemaPaths(
+            "direct_debits_report_schema.DirectDebitsReport",
+            ("direct_debits_schema.DirectDebits",),
+            "reported_payment_type",
+            "payment_type",
+        ),
+        "payment_system_operators": FamilySchemaPaths(
+            "payment_system_operators_report_schema.PaymentSystemOperatorsReport",
+            (
+                "payment_system_operators_schemas.ParticipantsInPaymentSystems",
+                "payment_system_operators_schemas.ConcentrationRatio",
+                "payment_system_operators_schemas.TransactionsInPaymentSystems",
+            ),
+            "reported_payment_system_metric",
+            "payment_system_metric",
+        ),
+        "quantity_items": FamilySchemaPaths(
+            "quantity_items_report_schema.QuantityItemsReport",
+            (
+                "quantity_items_schemas.ATMs",
+                "quantity_items_schemas.Cards",
+                "quantity_items_schemas.EMoneyTerminals",
+                "quantity_items_schemas.PosTerminals",
+                "quantity_items_schemas.PaymentAccounts",
+            ),
+            "reported_quantity_item",
+            "quantity_item",
+        ),
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class FamilySchemas:
+    """Report schema of a report family, and its item schemas per reported type."""
+
+    family: str
+    report: type[BaseModel]
+    items: Mapping[str, type[BaseModel]]
+    reported_type_field: str
+
+    def item_schema(self, report: BaseModel) -> type[BaseModel]:
+        """Item schema for a validated report."""
+        return self.items[getattr(report, self.reported_type_field)]
+
+
+def _import_schema(path: str) -> type[BaseModel]:
+    module, name = path.rsplit(".", 1)
+    return getattr(import_module(f"..schemas.{module}", __package__), name)
+
+
+@cache
+def family_schemas(family: str) -> FamilySchemas:
+    """Schemas of a report family, importing only the schema modules of the family."""
+    if family not in FAMILY_SCHEMA_PATHS:
+        raise ValueError(
+            f"Unknown report family. Got {family}, expected one of {list(FAMILY_SCHEMA_PATHS)}."
+        )
+    paths = FAMILY_SCHEMA_PATHS[family]
+    items: dict[str, type[BaseModel]] = {}
+    for path in paths.items:
+        schema = _import_schema(path)
+        for reported_type in schema.model_fields[paths.item_type_field].annotation:  # type: ignore[union-attr]
+            items[reported_type] = schema
+    return FamilySchemas(
+        family=family,
+        report=_import_schema(paths.report),
+        items=MappingProxyType(items),
+        reported_type_field=paths.reported_type_field,
+    )
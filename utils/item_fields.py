@@ -0,0 +1,30 @@
+"""Item batches and field value types.
+
+Shared by the item readers and the pipeline stages, so neither has to import the other.
+"""
+
+from enum import Enum
+from types import NoneType, UnionType
+from typing import Annotated, Any, Union, get_args, get_origin
+
+BATCH_SIZE = 1024
+"""Items per batch of threaded validation and of batched item readers."""
+
+
+def field_value_type(annotation: Any) -> Any:
+    """Type of the values of a field annotation, without optional, metadata and new types."""
+    while True:
+        if get_origin(annotation) in (Union, UnionType):
+            args = [arg for arg in get_args(annotation) if arg is not NoneType]
+            if len(args) != 1:
+                return str
+            annotation = args[0]
+        elif get_origin(annotation) is Annotated:
+            annotation = get_args(annotation)[0]
+        elif getattr(annotation, "__supertype__", None) is not None:
+            annotation = annotation.__supertype__
+        else:
+            break
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return type(next(iter(annotation)).value)
+    return annotation
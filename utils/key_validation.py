@@ -0,0 +1,81 @@
+"""Key validation.
+
+Fast structural pre-check of raw items before typed validation.
+The key set of an item is compared against the allowed and required keys of its schema,
+and items with missing required fields or extra fields (extra="forbid") are rejected
+without constructing a model.
+
+Errors are built by Pydantic's ValidationError, so they have the same shape as errors() elsewhere.
+"""
+
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import ErrorDetails, InitErrorDetails
+
+from ..utils.type_mapping import VALIDATOR_MAPPING
+
+
+class KeySchema:
+    """Allowed and required keys of a schema.
+
+    The key sets are compared with set operations on the dict key view,
+    which run in C and avoid a Python loop over the keys for valid items.
+    """
+
+    __slots__ = ("allowed", "required", "required_ordered", "schema")
+
+    def __init__(self, schema: type[BaseModel]) -> None:
+        """Precompute key sets of schema."""
+        self.schema = schema
+        self.allowed = frozenset(schema.model_fields)
+        self.required_ordered = tuple(
+            name for name, field in schema.model_fields.items() if field.is_required()
+        )
+        self.required = frozenset(self.required_ordered)
+
+    def is_valid(self, item: Mapping[str, Any]) -> bool:
+        """True when item has all required keys and no extra keys."""
+        keys = item.keys()
+        return keys >= self.required and keys <= self.allowed
+
+    def errors(self, item: Mapping[str, Any]) -> list[ErrorDetails]:
+        """Missing and extra key errors of item, empty when the keys are valid."""
+        if self.is_valid(item):
+            return []
+        errors: list[InitErrorDetails] = [
+            {"type": "missing", "loc": (name,), "input": item}
+            for name in self.required_ordered
+            if name not in item
+        ]
+        errors.extend(
+            {"type": "extra_forbidden", "loc": (key,), "input": value}
+            for key, value in item.items()
+            if key not in self.allowed
+        )
+        return ValidationError.from_exception_data(
+            self.schema.__name__, errors
+        ).errors()
+
+
+# Read-only after import, so it can be shared by validation threads without locking.
+KEY_SCHEMAS: Mapping[type[BaseModel], KeySchema] = MappingProxyType(
+    {schema: KeySchema(schema) for schema in set(VALIDATOR_MAPPING.values())}
+)
+
+
+def key_schema(schema: type[BaseModel]) -> KeySchema:
+    """Key schema of schema, built on each call for schemas outside VALIDATOR_MAPPING."""
+    key_schema = KEY_SCHEMAS.get(schema)
+    if key_schema is None:
+        key_schema = KeySchema(schema)
+    return key_schema
+
+
+def validate_keys(
+    schema: type[BaseModel], item: Mapping[str, Any]
+) -> list[ErrorDetails]:
+    """Missing and extra key errors of item for schema."""
+    return key_schema(schema).errors(item)
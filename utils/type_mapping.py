@@ -1,9 +1,12 @@
 """Maps reported type to schema.
 
 Used to determine which schema to validate against depending on reported_type.
+The mappings are read-only, so they can be shared by validation threads without locking.
 """
 
+from collections.abc import Mapping
 from enum import StrEnum
+from types import MappingProxyType
 
 from pydantic import BaseModel
 
@@ -72,9 +75,10 @@ from ..schemas.transaction_schemas import (
     CreditTransfer,
     InstantCreditTransfer,
 )
+from .family_schemas import FAMILY_SCHEMA_PATHS, family_schemas
 
 
-VALIDATOR_MAPPING: dict[str, type[BaseModel]] = {}
+_validator_mapping: dict[str, type[BaseModel]] = {}
 types_to_validator: dict[type[StrEnum], type[BaseModel]] = {
     # Transactions
     PaymentTypeCardPaymentAcquirer: CardPaymentAcquirer,
@@ -103,13 +107,37 @@ types_to_validator: dict[type[StrEnum], type[BaseModel]] = {
 
 for types, validator in types_to_validator.items():
     for _type in list(types):
-        VALIDATOR_MAPPING[_type] = validator
+        _validator_mapping[_type] = validator
 
+VALIDATOR_MAPPING: Mapping[str, type[BaseModel]] = MappingProxyType(_validator_mapping)
 
-REPORT_VALIDATOR_MAPPING: dict[str, type[BaseModel]] = {
-    "transactions": TransactionReport,
-    "aggregates": AggregateReport,
-    "direct_debits": DirectDebitsReport,
-    "payment_system_operators": PaymentSystemOperatorsReport,
-    "quantity_items": QuantityItemsReport,
-}
+
+REPORT_VALIDATOR_MAPPING: Mapping[str, type[BaseModel]] = MappingProxyType(
+    {
+        "transactions": TransactionReport,
+        "aggregates": AggregateReport,
+        "direct_debits": DirectDebitsReport,
+        "payment_system_operators": PaymentSystemOperatorsReport,
+        "quantity_items": QuantityItemsReport,
+    }
+)
+
+
+def _check_family_schemas() -> None:
+    """Raise when FAMILY_SCHEMA_PATHS names other schemas than the mappings above.
+
+    Worker processes import the schemas through FAMILY_SCHEMA_PATHS, so both have to agree.
+    """
+    reports = {family: family_schemas(family).report for family in FAMILY_SCHEMA_PATHS}
+    items = {
+        reported_type: schema
+        for family in FAMILY_SCHEMA_PATHS
+        for reported_type, schema in family_schemas(family).items.items()
+    }
+    if reports != REPORT_VALIDATOR_MAPPING or items != VALIDATOR_MAPPING:
+        raise ImportError(
+            "Malformed FAMILY_SCHEMA_PATHS. Expected the schemas of REPORT_VALIDATOR_MAPPING and VALIDATOR_MAPPING."
+        )
+
+
+_check_family_schemas()
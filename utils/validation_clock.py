@@ -0,0 +1,36 @@
+"""Validation clock.
+
+Captures a single reference "now" for a report validation run,
+so timestamps do not need a clock read and a time zone lookup per value.
+The clock can be given a fixed time for deterministic tests and batch evaluation.
+"""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+STOCKHOLM = ZoneInfo("Europe/Stockholm")
+
+
+class ValidationClock:
+    """Validation clock.
+
+    The reference time is converted once to naive Stockholm local time,
+    so naive timestamps (interpreted as Stockholm local time) are compared without time zone handling.
+    """
+
+    __slots__ = ("now", "stockholm_cutoff")
+
+    def __init__(self, now: datetime | None = None) -> None:
+        """Set up clock at now, the current time when None. A naive now is interpreted as Stockholm local time."""
+        if now is None:
+            now = datetime.now(tz=STOCKHOLM)
+        elif now.tzinfo is None:
+            now = now.replace(tzinfo=STOCKHOLM)
+        self.now = now.astimezone(STOCKHOLM)
+        self.stockholm_cutoff = self.now.replace(tzinfo=None)
+
+    def is_past_in_stockholm(self, v: datetime) -> bool:
+        """True when v, as Stockholm local time, is before the reference time."""
+        if v.tzinfo is not None:
+            v = v.replace(tzinfo=None)
+        return v < self.stockholm_cutoff
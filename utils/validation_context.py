@@ -0,0 +1,97 @@
+"""Validation context.
+
+The report header values date_from, date_to and reported_payment_type are used by the item rules.
+Instead of injecting them into every item, they are shared across all items of a report
+through the Pydantic validation context.
+
+Example:
+    context = ReportContext.from_report(report)
+    for item in report.items:
+        CreditTransfer.model_validate(item, context=context)
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from enum import StrEnum
+from typing import Any, Self
+
+from pydantic import BaseModel, ValidationInfo
+
+from ..utils.validation_clock import ValidationClock
+
+
+@dataclass(frozen=True, slots=True)
+class ReportContext:
+    """Report header values shared by all items in a report.
+
+    With deferred_rules set, the model validators skip the cross-field rules and the
+    caller runs rule_errors itself.
+    """
+
+    date_from: date | None = None
+    date_to: date | None = None
+    reported_payment_type: StrEnum | None = None
+    clock: ValidationClock | None = None
+    deferred_rules: bool = False
+
+    @classmethod
+    def from_report(
+        cls, report: BaseModel, clock: ValidationClock | None = None
+    ) -> Self:
+        """Context from a validated report."""
+        return cls(
+            date_from=getattr(report, "date_from", None),
+            date_to=getattr(report, "date_to", None),
+            reported_payment_type=getattr(report, "reported_payment_type", None),
+            clock=clock,
+        )
+
+
+EMPTY_CONTEXT = ReportContext()
+
+
+def report_context(item: BaseModel, info: ValidationInfo) -> ReportContext:
+    """Report header values for the item rules.
+
+    Values injected into the item take precedence over the validation context,
+    so items validated the old way get the same results.
+    """
+    context = info.context if isinstance(info.context, ReportContext) else EMPTY_CONTEXT
+    return item_context(item, context)
+
+
+def item_context(item: BaseModel, context: ReportContext) -> ReportContext:
+    """Report header values for the item rules, from the item or else from context."""
+    date_from = getattr(item, "date_from", None)
+    date_to = getattr(item, "date_to", None)
+    reported_payment_type = getattr(item, "reported_payment_type", None)
+    if date_from is None and date_to is None and reported_payment_type is None:
+        return context
+    return ReportContext(
+        date_from=date_from or context.date_from,
+        date_to=date_to or context.date_to,
+        reported_payment_type=reported_payment_type or context.reported_payment_type,
+        clock=context.clock,
+        deferred_rules=context.deferred_rules,
+    )
+
+
+def rules_deferred(info: ValidationInfo) -> bool:
+    """True when the validation context leaves the cross-field rules to the caller."""
+    context = info.context
+    return isinstance(context, ReportContext) and context.deferred_rules
+
+
+def context_clock(info: ValidationInfo) -> ValidationClock:
+    """Clock of the validation context, a clock at the current time when there is none."""
+    context = info.context
+    if isinstance(context, ReportContext) and context.clock is not None:
+        return context.clock
+    return ValidationClock()
+
+
+def validate_item(
+    schema: type[BaseModel], item: dict[str, Any], context: ReportContext
+) -> BaseModel:
+    """Validate item against schema with the report context."""
+    return schema.model_validate(item, context=context)